@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import re
+import secrets
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("quillium.batching")
+
+# generate(prompt, max_output_tokens) -> reply text
+GenerateFn = Callable[[str, int], Awaitable[str]]
+
+BATCH_PROMPT_HEADER = (
+    "Answer each of the following student questions separately. "
+    "Start every answer on its own line with the matching tag ({first}, {second}, ...) "
+    "and do not refer to the other questions.\n\n"
+)
+# Anything a student could use to forge an answer tag, whatever its token
+_TAG_LIKE_RE = re.compile(r"<\s*/?\s*A[\s\w-]*>", re.IGNORECASE)
+
+
+class DuplicateAnswerTag(ValueError):
+    """A batched reply used the same answer tag twice, so its answers can't be trusted."""
+
+
+def new_batch_token() -> str:
+    """Random per-batch nonce that students cannot predict and embed in their questions."""
+    return secrets.token_hex(8)
+
+
+def answer_tag(token: str, index: int) -> str:
+    return f"<A-{token}-{index}>"
+
+
+def build_batch_prompt(messages: List[str], token: str) -> str:
+    """Combine several questions into one prompt with nonce-tagged answer slots."""
+    header = BATCH_PROMPT_HEADER.format(first=answer_tag(token, 1), second=answer_tag(token, 2))
+    questions = "\n".join(
+        f"Q{i}: {_TAG_LIKE_RE.sub(' ', message)}" for i, message in enumerate(messages, start=1)
+    )
+    return header + questions
+
+
+def parse_batch_reply(reply: str, count: int, token: str) -> Dict[int, str]:
+    """
+    Split a batched reply into {question index: answer}, skipping empty or unknown tags.
+
+    Raises DuplicateAnswerTag if any tag appears twice, since one answer may
+    then have been written by another question's author.
+    """
+    parts = re.split(rf"<A-{re.escape(token)}-(\d+)>", reply)
+    indices = [int(tag) - 1 for tag in parts[1::2]]
+    if len(indices) != len(set(indices)):
+        raise DuplicateAnswerTag("answer tag repeated in batched reply")
+    answers: Dict[int, str] = {}
+    # parts = [preamble, tag, answer, tag, answer, ...]
+    for index, answer in zip(indices, parts[2::2]):
+        answer = answer.strip()
+        if 0 <= index < count and answer:
+            answers[index] = answer
+    return answers
+
+
+class AskBatcher:
+    """
+    Coalesce concurrent tutor questions into a single Gemini request.
+
+    Questions queue up for at most ``max_wait`` seconds (or until
+    ``max_batch_size`` are waiting) and are then answered by one batched
+    prompt. Answers missing from the batched reply, and batches of one,
+    fall back to an ordinary single-question call.
+    """
+
+    def __init__(
+        self,
+        generate: GenerateFn,
+        max_batch_size: int = 8,
+        max_wait: float = 0.025,
+        max_output_tokens: int = 512,
+    ):
+        self._generate = generate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_output_tokens = max_output_tokens
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._runner: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [task for task in (self._runner, *self._in_flight) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        self._in_flight.clear()
+
+    async def submit(self, message: str) -> str:
+        """Queue a question and wait for its answer."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without awaiting so the next batch can fill while this one is in flight
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Skip questions whose callers have already gone away
+        batch = [(message, future) for message, future in batch if not future.done()]
+        if not batch:
+            return
+        if len(batch) == 1:
+            await self._answer_single(*batch[0])
+            return
+
+        messages = [message for message, _ in batch]
+        token = new_batch_token()
+        try:
+            reply = await self._generate(build_batch_prompt(messages, token), self.max_output_tokens * len(batch))
+            answers = parse_batch_reply(reply, len(batch), token)
+        except Exception as exc:
+            logger.warning("Batched ask failed for %d questions, answering individually: %s", len(batch), exc)
+            answers = {}
+
+        missing = []
+        for index, (message, future) in enumerate(batch):
+            if index in answers:
+                if not future.done():
+                    future.set_result(answers[index])
+            else:
+                missing.append((message, future))
+        if missing:
+            logger.info("Batched ask missing %d/%d answers, retrying individually", len(missing), len(batch))
+            await asyncio.gather(*(self._answer_single(message, future) for message, future in missing))
+
+    async def _answer_single(self, message: str, future: asyncio.Future) -> None:
+        try:
+            reply = await self._generate(message, self.max_output_tokens)
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        if not future.done():
+            future.set_result(reply)
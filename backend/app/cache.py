@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different prompts share a key."""
+    return " ".join(text.lower().split())
+
+
+def prompt_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a normalized prompt."""
+    return hashlib.sha256(normalize_prompt(text).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent exact-match cache for deterministic LLM/TTS outputs.
+
+    Values are strings keyed by a SHA-256 digest of the request parameters and
+    stored in a small SQLite table, so cached results survive restarts.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Build a stable cache key from the parameters that determine the output."""
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    In-process LRU of serialized LLM responses keyed by request digests.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    dropped once ``max_entries`` is reached. Keys come from ``LLMCache.make_key``
+    so callers can fold a prompt version into them and invalidate by bumping it.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SemanticCache:
+    """
+    In-process cache of LLM replies keyed by prompt embeddings.
+
+    Lookups first try an exact match on the normalized prompt hash, then fall
+    back to the best cosine similarity against every stored embedding. Entries
+    expire after ``ttl_seconds`` and the oldest ones are dropped once
+    ``max_entries`` is reached.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl_seconds: float = 3600, max_entries: int = 1024):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._exact: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Rows are unit-normalized on insert so a dot product is the cosine similarity
+        self._matrix: Optional[np.ndarray] = None
+        self._replies: List[str] = []
+        self._expires: List[float] = []
+
+    def get_exact(self, prompt: str) -> Optional[str]:
+        """Return the cached reply for an identical (normalized) prompt."""
+        with self._lock:
+            self._evict_expired()
+            entry = self._exact.get(prompt_hash(prompt))
+            return entry[1] if entry else None
+
+    def get_similar(self, embedding: Sequence[float]) -> Optional[str]:
+        """Return the reply whose prompt embedding is closest, if it clears the threshold."""
+        query = _unit_vector(embedding)
+        with self._lock:
+            self._evict_expired()
+            if query is None or self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                return None
+            scores = self._matrix @ query
+            best = int(np.argmax(scores))
+            return self._replies[best] if scores[best] >= self.threshold else None
+
+    def add(self, prompt: str, embedding: Optional[Sequence[float]], reply: str) -> None:
+        """Store a reply under the prompt hash and, when available, its embedding."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        vector = _unit_vector(embedding) if embedding is not None else None
+        key = prompt_hash(prompt)
+        with self._lock:
+            self._evict_expired()
+            self._exact[key] = (expires_at, reply)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+
+            if vector is None:
+                return
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                # First entry (or the embedding model changed): start a fresh matrix
+                self._matrix = vector.reshape(1, -1)
+                self._replies = [reply]
+                self._expires = [expires_at]
+            else:
+                self._matrix = np.vstack([self._matrix, vector])
+                self._replies.append(reply)
+                self._expires.append(expires_at)
+            if len(self._replies) > self.max_entries:
+                self._drop_oldest(len(self._replies) - self.max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._matrix = None
+            self._replies = []
+            self._expires = []
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        while self._exact:
+            key, (expires_at, _) = next(iter(self._exact.items()))
+            if expires_at > now:
+                break
+            del self._exact[key]
+
+        # Entries are appended in expiry order, so expired rows form a prefix
+        expired = 0
+        for expires_at in self._expires:
+            if expires_at > now:
+                break
+            expired += 1
+        if expired:
+            self._drop_oldest(expired)
+
+    def _drop_oldest(self, count: int) -> None:
+        del self._replies[:count]
+        del self._expires[:count]
+        self._matrix = self._matrix[count:] if self._replies else None
+
+
+def _unit_vector(embedding: Sequence[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    if vector.ndim != 1:
+        return None
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else None
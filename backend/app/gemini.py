@@ -0,0 +1,66 @@
+import asyncio
+import os
+from typing import Optional
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+# Gemini errors worth retrying: 429 rate limits, transient 5xx responses and timeouts
+RETRYABLE_GEMINI_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+# Jittered so concurrent requests hitting the same 429 don't retry in lockstep
+GEMINI_RETRY_POLICY = dict(
+    retry=retry_if_exception_type(RETRYABLE_GEMINI_ERRORS),
+    wait=wait_exponential_jitter(initial=0.5, max=5),
+    stop=stop_after_attempt(3),
+    reraise=True,
+)
+# Cap on concurrent Gemini calls from this process, to stay under rate limits
+GEMINI_SEM = asyncio.Semaphore(int(os.getenv("GEMINI_MAX_CONCURRENCY", "16")))
+
+# Key the SDK was last configured with
+_configured_key: Optional[str] = None
+
+
+def gemini_api_key() -> Optional[str]:
+    """Current GEMINI_API_KEY, read from the environment on every call."""
+    return os.getenv("GEMINI_API_KEY")
+
+
+def configure_gemini(api_key: Optional[str] = None) -> bool:
+    """
+    Configure the Gemini SDK with ``api_key`` (default: the environment's key).
+
+    Does nothing if the SDK is already configured with that key. Returns
+    whether a key is available.
+    """
+    global _configured_key
+    key = api_key or gemini_api_key()
+    if key and key != _configured_key:
+        genai.configure(api_key=key)
+        _configured_key = key
+    return bool(key)
+
+
+def is_retryable_gemini_error(exc: BaseException) -> bool:
+    return isinstance(exc, RETRYABLE_GEMINI_ERRORS)
+
+
+async def generate_content(model, prompt, **kwargs):
+    """
+    Call Gemini's async API under GEMINI_SEM, retrying per GEMINI_RETRY_POLICY.
+
+    With ``stream=True`` the semaphore only covers opening the stream.
+    """
+    async for attempt in AsyncRetrying(**GEMINI_RETRY_POLICY):
+        with attempt:
+            async with GEMINI_SEM:
+                return await model.generate_content_async(prompt, **kwargs)
+
+
+configure_gemini()
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+
+class JobStore:
+    """
+    SQLite-backed table of background jobs, shared by every worker process.
+
+    Job payloads are stored as JSON strings. Each job holds the idempotency
+    key of its upload until it fails, so a re-upload handled by any worker
+    finds the existing job instead of starting another.
+
+    With ``stale_after`` set, jobs still unfinished that many seconds after
+    they were claimed (their worker crashed or was killed) are finished with
+    ``stale_payload(job_id)`` and release their key.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        stale_after: Optional[float] = None,
+        stale_payload: Optional[Callable[[str], str]] = None,
+    ):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._stale_after = stale_after
+        self._stale_payload = stale_payload
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL lets workers read job status while another one is writing
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, idempotency_key TEXT UNIQUE, "
+            "finished INTEGER NOT NULL DEFAULT 0, payload TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def claim(self, idempotency_key: str, job_id: str, payload: str) -> Tuple[str, str]:
+        """
+        Register ``job_id`` for ``idempotency_key`` unless another job already holds it.
+
+        Returns (job_id, payload) of whichever job owns the key afterwards.
+        """
+        with self._lock:
+            self._fail_stale()
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, idempotency_key, finished, payload, updated_at) "
+                "VALUES (?, ?, 0, ?, ?)",
+                (job_id, idempotency_key, payload, time.time()),
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT job_id, payload FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return row[0], row[1]
+
+    def get(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            self._fail_stale()
+            row = self._conn.execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def finish(self, job_id: str, payload: str, release_key: bool = False) -> None:
+        """Store a finished job's payload; ``release_key`` lets the same upload start a fresh job."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET payload = ?, finished = 1, updated_at = ?, "
+                "idempotency_key = CASE WHEN ? THEN NULL ELSE idempotency_key END "
+                "WHERE job_id = ?",
+                (payload, time.time(), release_key, job_id),
+            )
+            self._conn.commit()
+
+    def prune(self, keep: int) -> None:
+        """Drop all but the ``keep`` most recently finished jobs."""
+        with self._lock:
+            self._fail_stale()
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished = 1 AND job_id NOT IN ("
+                "SELECT job_id FROM jobs WHERE finished = 1 ORDER BY updated_at DESC, rowid DESC LIMIT ?)",
+                (keep,),
+            )
+            self._conn.commit()
+
+    def _fail_stale(self) -> None:
+        # Callers hold self._lock
+        if self._stale_after is None or self._stale_payload is None:
+            return
+        cutoff = time.time() - self._stale_after
+        stale = self._conn.execute(
+            "SELECT job_id FROM jobs WHERE finished = 0 AND updated_at < ?", (cutoff,)
+        ).fetchall()
+        if not stale:
+            return
+        self._conn.executemany(
+            "UPDATE jobs SET payload = ?, finished = 1, updated_at = ?, idempotency_key = NULL "
+            "WHERE job_id = ? AND finished = 0",
+            [(self._stale_payload(job_id), time.time(), job_id) for (job_id,) in stale],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
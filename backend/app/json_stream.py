@@ -0,0 +1,68 @@
+from typing import Dict, List, Optional
+
+import orjson
+
+
+class JsonObjectStream:
+    """
+    Incrementally pull complete top-level objects out of a streamed JSON array.
+
+    Text is fed in arbitrary pieces; ``feed`` returns every object whose
+    closing brace has arrived. Objects are only collected inside a ``[ ... ]``
+    array, so code fences, surrounding prose and stray braces before the
+    array are ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._depth = 0
+        self._start: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[Dict]:
+        self._buffer += text
+        buffer = self._buffer
+        objects = []
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._depth:
+                if ch == '"':
+                    self._in_string = True
+                elif ch == "{":
+                    self._depth += 1
+                elif ch == "}":
+                    self._depth -= 1
+                    if not self._depth:
+                        try:
+                            parsed = orjson.loads(buffer[self._start:i + 1])
+                        except orjson.JSONDecodeError:
+                            parsed = None
+                        if isinstance(parsed, dict):
+                            objects.append(parsed)
+                        self._start = None
+            elif ch == "[":
+                self._in_array = True
+            elif ch == "]":
+                self._in_array = False
+            elif ch == "{" and self._in_array:
+                self._start = i
+                self._depth = 1
+
+        # Keep only the unfinished object so the buffer doesn't grow with the stream
+        if self._start is None:
+            self._buffer, self._pos = "", 0
+        else:
+            self._buffer = buffer[self._start:]
+            self._pos = len(buffer) - self._start
+            self._start = 0
+        return objects
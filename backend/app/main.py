@@ -1,28 +1,62 @@
+import asyncio
+import atexit
+import hashlib
+import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import shutil
+import sys
+from typing import BinaryIO, Optional
 from uuid import uuid4
 from dotenv import load_dotenv
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
 import google.generativeai as genai
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ENV_PATH = os.path.join(BASE_DIR, ".env")
 load_dotenv(ENV_PATH)
 
+# One root configuration for app and uvicorn loggers (the launchers pass log_config=None).
+# Records are queued and written by a listener thread, keeping stream I/O off request paths.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# QueueHandler.prepare() bakes its formatted text into record.msg, so it must only
+# render the message (plus any traceback); the listener's handler adds the prefix
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler], force=True)
+LOG_LISTENER = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+LOG_LISTENER.start()
+atexit.register(LOG_LISTENER.stop)
+logger = logging.getLogger("quillium")
+
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_API_KEY_PRESENT = bool(GEMINI_API_KEY)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-print("✅ GEMINI_API_KEY loaded:", GEMINI_API_KEY_PRESENT)
-print("✅ OPENAI_API_KEY loaded:", bool(OPENAI_API_KEY))
+logger.info("✅ GEMINI_API_KEY loaded: %s", GEMINI_API_KEY_PRESENT)
+logger.info("✅ OPENAI_API_KEY loaded: %s", bool(OPENAI_API_KEY))
 
 AUDIO_DIR = os.path.join(BASE_DIR, "audio")
 os.makedirs(AUDIO_DIR, exist_ok=True)
+CACHE_DIR = os.path.join(BASE_DIR, ".cache")
+JOBS_DIR = os.path.join(BASE_DIR, "jobs")
+os.makedirs(JOBS_DIR, exist_ok=True)
 
-import logging
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+import anyio
+import orjson
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from contextlib import asynccontextmanager
+from starlette.background import BackgroundTask
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from tenacity import AsyncRetrying, retry_if_exception
 
 from .models import (
     ProcessRequest,
@@ -34,18 +68,59 @@ from .models import (
     ShortAudioResponse,
     AskQuillRequest,
     AskQuillResponse,
+    JobResponse,
+    JobStatus,
+)
+from .batching import AskBatcher
+from .cache import LLMCache, SemanticCache
+from .gemini import GEMINI_RETRY_POLICY, GEMINI_SEM, generate_content, is_retryable_gemini_error
+from .jobs import JobStore
+from .pdf_processor import extract_text_from_pdf_adaptive
+from .mcq_generator import (
+    make_mcqs,
+    make_mcqs_stream,
+    make_flashcards,
+    init_translator,
+    generate_short_form_script,
 )
-from .pdf_processor import extract_text_from_pdf
-from .mcq_generator import make_mcqs, make_flashcards, init_translator, generate_short_form_script
-
-openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
-logger = logging.getLogger("quillium")
-logging.basicConfig(level=logging.INFO)
+openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
 # Global state
 translator_loaded = False
 
+# Cap on concurrent OpenAI calls, to stay under rate limits (Gemini's is GEMINI_SEM)
+OPENAI_SEM = asyncio.Semaphore(int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")))
+
+# Worker threads shared by run_in_threadpool and anyio.to_thread (upload I/O, PDF parsing)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "64"))
+# Worker processes for extracting very large PDFs
+PDF_POOL_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+PDF_MAGIC = b"%PDF"
+PREVIEW_CHARS = 500
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Finished background jobs kept around for polling (shared by all workers)
+MAX_STORED_JOBS = 256
+# Jobs still processing after this long are assumed lost with a crashed worker
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", str(30 * 60)))
+
+# Kept out of the user turn so the shared prefix is eligible for Gemini's implicit prompt cache
+TUTOR_SYSTEM = "You are Quill, an AI tutor. Answer the student's question clearly and concisely."
+ASK_QUILL_FALLBACK_REPLY = "I'm having trouble answering right now. Please try again."
+TUTOR_MODEL = "gemini-2.5-flash-lite"
+TUTOR_TEMPERATURE = 0.4
+TUTOR_MAX_OUTPUT_TOKENS = 512
+TUTOR_GEN_CONFIG = genai.types.GenerationConfig(
+    temperature=TUTOR_TEMPERATURE,
+    max_output_tokens=TUTOR_MAX_OUTPUT_TOKENS,
+)
+EMBEDDING_MODEL = "models/text-embedding-004"
+SHORTS_MODEL = "gemini-2.5-flash-lite"
+TTS_MODEL = "gpt-4o-mini-tts"
+TTS_VOICE = "alloy"
+TTS_STREAM_CHUNK_SIZE = 4096
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -54,19 +129,72 @@ async def lifespan(app: FastAPI):
         # Initialize translator (now just a dummy function in the new code)
         init_translator()
         translator_loaded = True
-        print("✅ Translator initialized")
+        logger.info("✅ Translator initialized")
     except Exception as e:
-        print(f"⚠️ Translator initialization note: {e}")
+        logger.warning("⚠️ Translator initialization note: %s", e)
         translator_loaded = False
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # spawn rather than fork: the parent already holds gRPC and worker threads
+    app.state.pdf_pool = ProcessPoolExecutor(
+        max_workers=PDF_POOL_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    app.state.gemini_model = genai.GenerativeModel(TUTOR_MODEL, system_instruction=TUTOR_SYSTEM)
+    app.state.ask_cache = SemanticCache(threshold=0.92, ttl_seconds=3600)
+    app.state.llm_cache = LLMCache(os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+    app.state.ask_batcher = AskBatcher(_generate_tutor_reply, max_output_tokens=TUTOR_MAX_OUTPUT_TOKENS)
+    app.state.ask_batcher.start()
+    app.state.jobs = JobStore(
+        os.path.join(CACHE_DIR, "jobs.sqlite3"),
+        stale_after=JOB_STALE_SECONDS,
+        stale_payload=_stale_job_payload,
+    )
+    app.state.job_tasks = set()
     yield
     # Shutdown
-    print("👋 Shutting down Quillium backend")
+    await app.state.ask_batcher.stop()
+    job_tasks = list(app.state.job_tasks)
+    for task in job_tasks:
+        task.cancel()
+    # Let cancelled jobs record their failure before the store closes
+    await asyncio.gather(*job_tasks, return_exceptions=True)
+    app.state.llm_cache.close()
+    app.state.jobs.close()
+    app.state.pdf_pool.shutdown(wait=False, cancel_futures=True)
+    logger.info("👋 Shutting down Quillium backend")
+
+# Supported languages, encoded once at import since the catalog never changes
+LANGUAGES = {
+    "English": ["English"],
+    "European Languages": [
+        "Spanish", "French", "German", "Italian", "Portuguese",
+        "Russian", "Dutch", "Polish", "Ukrainian", "Romanian",
+        "Greek", "Czech", "Swedish", "Norwegian", "Danish",
+        "Finnish", "Hungarian", "Bulgarian"
+    ],
+    "Asian Languages": [
+        "Chinese", "Japanese", "Korean", "Arabic", "Hebrew",
+        "Turkish", "Thai", "Vietnamese", "Indonesian", "Malay",
+        "Filipino", "Persian", "Hindi", "Tamil", "Telugu",
+        "Kannada", "Malayalam", "Bengali", "Marathi", "Gujarati",
+        "Punjabi", "Urdu"
+    ],
+    "Other Languages": [
+        "Swahili", "Zulu", "Afrikaans", "Catalan", "Croatian",
+        "Serbian", "Slovak", "Slovenian", "Lithuanian", "Latvian",
+        "Estonian", "Maltese", "Icelandic"
+    ]
+}
+LANGUAGES_JSON = orjson.dumps(LANGUAGES)
+LANGUAGES_ETAG = f'"{hashlib.sha256(LANGUAGES_JSON).hexdigest()[:16]}"'
+LANGUAGES_HEADERS = {"ETag": LANGUAGES_ETAG, "Cache-Control": "public, max-age=86400"}
 
 app = FastAPI(
     title="Quillium API",
     description="AI-powered quiz and flashcard generator from PDF documents",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.mount("/audio", StaticFiles(directory=AUDIO_DIR), name="audio")
@@ -78,11 +206,15 @@ default_dev_origins = [
     "https://quillium.vercel.app",
 ]
 env_origins = os.getenv("ALLOWED_ORIGINS", "")
-allowed_origins = env_origins.split(",") if env_origins else default_dev_origins
+# Trim entries so " https://foo" from a comma-and-space list still matches
+allowed_origins = tuple(o.strip() for o in env_origins.split(",") if o.strip()) or tuple(default_dev_origins)
+# Optional single regex (e.g. ^https://(quillium\.vercel\.app|localhost:3000)$) for high-RPS deployments
+allowed_origin_regex = os.getenv("ALLOWED_ORIGIN_REGEX") or None
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
+    allow_origin_regex=allowed_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -113,29 +245,49 @@ async def debug_env():
     return {"gemini": bool(os.getenv("GEMINI_API_KEY"))}
 
 @app.get("/languages")
-async def get_languages():
-    languages = {
-        "English": ["English"],
-        "European Languages": [
-            "Spanish", "French", "German", "Italian", "Portuguese",
-            "Russian", "Dutch", "Polish", "Ukrainian", "Romanian",
-            "Greek", "Czech", "Swedish", "Norwegian", "Danish",
-            "Finnish", "Hungarian", "Bulgarian"
-        ],
-        "Asian Languages": [
-            "Chinese", "Japanese", "Korean", "Arabic", "Hebrew",
-            "Turkish", "Thai", "Vietnamese", "Indonesian", "Malay",
-            "Filipino", "Persian", "Hindi", "Tamil", "Telugu",
-            "Kannada", "Malayalam", "Bengali", "Marathi", "Gujarati",
-            "Punjabi", "Urdu"
-        ],
-        "Other Languages": [
-            "Swahili", "Zulu", "Afrikaans", "Catalan", "Croatian",
-            "Serbian", "Slovak", "Slovenian", "Lithuanian", "Latvian",
-            "Estonian", "Maltese", "Icelandic"
-        ]
-    }
-    return languages
+async def get_languages(request: Request):
+    # The catalog is static: serve pre-encoded bytes and let clients revalidate by ETag
+    if request.headers.get("if-none-match") == LANGUAGES_ETAG:
+        return Response(status_code=304, headers=LANGUAGES_HEADERS)
+    return Response(content=LANGUAGES_JSON, media_type="application/json", headers=LANGUAGES_HEADERS)
+
+def _is_retryable_provider_error(exc: BaseException) -> bool:
+    """True for transient Gemini errors and rate-limit / overload responses from OpenAI."""
+    if is_retryable_gemini_error(exc) or isinstance(exc, openai.RateLimitError):
+        return True
+    return isinstance(exc, openai.APIStatusError) and exc.status_code == 503
+
+def _provider_retrying() -> AsyncRetrying:
+    """GEMINI_RETRY_POLICY's backoff, also applied to OpenAI's 429/503 responses."""
+    return AsyncRetrying(**{**GEMINI_RETRY_POLICY, "retry": retry_if_exception(_is_retryable_provider_error)})
+
+async def _embed_message(message: str):
+    """Embed a student question for semantic cache lookups; None if embedding fails."""
+    try:
+        async with GEMINI_SEM:
+            result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=message)
+        return result["embedding"]
+    except Exception as exc:
+        logger.warning("/ask-quill embedding failed, skipping semantic cache: %s", exc)
+        return None
+
+async def _generate_tutor_reply(prompt: str, max_output_tokens: int) -> str:
+    """Send one (possibly batched) prompt to the tutor model and return the reply text."""
+    generation_config = TUTOR_GEN_CONFIG
+    if max_output_tokens != TUTOR_MAX_OUTPUT_TOKENS:
+        generation_config = genai.types.GenerationConfig(
+            temperature=TUTOR_TEMPERATURE,
+            max_output_tokens=max_output_tokens,
+        )
+    response = await generate_content(app.state.gemini_model, prompt, generation_config=generation_config)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        logger.info(
+            "/ask-quill tokens: prompt=%s cached=%s",
+            usage.prompt_token_count,
+            usage.cached_content_token_count,
+        )
+    return (response.text or "").strip()
 
 @app.post("/ask-quill", response_model=AskQuillResponse)
 async def ask_quill(payload: AskQuillRequest):
@@ -145,37 +297,46 @@ async def ask_quill(payload: AskQuillRequest):
 
     if not GEMINI_API_KEY:
         logger.error("/ask-quill attempted without GEMINI_API_KEY")
-        return AskQuillResponse(reply="I'm having trouble answering right now. Please try again.")
+        return AskQuillResponse(reply=ASK_QUILL_FALLBACK_REPLY)
 
-    prompt = (
-        "You are Quill, an AI tutor. Answer this student question clearly and concisely:\n\n"
-        f"{message}"
-    )
+    cache: SemanticCache = app.state.ask_cache
+    cached_reply = cache.get_exact(message)
+    if cached_reply is not None:
+        return AskQuillResponse(reply=cached_reply)
+
+    embedding = await _embed_message(message)
+    if embedding is not None:
+        cached_reply = cache.get_similar(embedding)
+        if cached_reply is not None:
+            return AskQuillResponse(reply=cached_reply)
 
     try:
-        genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.4,
-                "max_output_tokens": 512,
-            }
-        )
-        reply_text = (response.text or "").strip()
+        # Concurrent questions are coalesced into one Gemini request by the batcher
+        reply_text = await app.state.ask_batcher.submit(message)
         if not reply_text:
             logger.warning("/ask-quill returned empty response from Gemini")
-            return AskQuillResponse(reply="I'm having trouble answering right now. Please try again.")
+            return AskQuillResponse(reply=ASK_QUILL_FALLBACK_REPLY)
+        cache.add(message, embedding, reply_text)
         return AskQuillResponse(reply=reply_text)
     except Exception as exc:
         logger.error("/ask-quill failed: %s", exc)
-        return AskQuillResponse(reply="I'm having trouble answering right now. Please try again.")
+        return AskQuillResponse(reply=ASK_QUILL_FALLBACK_REPLY)
 
 @app.post("/generate-short-script", response_model=ShortScriptResponse)
 async def generate_short_script_endpoint(payload: ShortScriptRequest):
     """Generate a short spoken-style script for Quillium Shorts."""
     logger.info("🎬 /generate-short-script called with topic='%s'", payload.topic)
-    script = generate_short_form_script(payload.topic)
+    topic = (payload.topic or "").strip()
+    cache: LLMCache = app.state.llm_cache
+    cache_key = LLMCache.make_key(kind="short-script", model=SHORTS_MODEL, topic=topic)
+    cached_script = cache.get(cache_key)
+    if cached_script is not None:
+        return ShortScriptResponse(script=cached_script)
+
+    script, is_fallback = await generate_short_form_script(topic)
+    # Don't pin the offline fallback script for a topic Gemini can answer later
+    if not is_fallback:
+        cache.set(cache_key, script)
     return ShortScriptResponse(script=script)
 
 @app.post("/generate-short-audio", response_model=ShortAudioResponse)
@@ -187,22 +348,208 @@ async def generate_short_audio(payload: ShortAudioRequest):
     if not openai_client:
         raise HTTPException(status_code=500, detail="OPENAI_API_KEY is not configured")
 
+    cache: LLMCache = app.state.llm_cache
+    cache_key = _short_audio_cache_key(script)
+    cached_name = _cached_short_audio(cache, cache_key)
+    if cached_name:
+        return ShortAudioResponse(audio_url=f"/audio/{cached_name}")
+
     file_name = f"short_{uuid4().hex}.mp3"
     file_path = os.path.join(AUDIO_DIR, file_name)
 
     try:
-        with openai_client.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
-            voice="alloy",
-            input=script,
-        ) as response:
-            response.stream_to_file(file_path)
+        async for attempt in _provider_retrying():
+            with attempt:
+                async with OPENAI_SEM:
+                    async with openai_client.audio.speech.with_streaming_response.create(
+                        model=TTS_MODEL,
+                        voice=TTS_VOICE,
+                        input=script,
+                    ) as response:
+                        await response.stream_to_file(file_path)
     except Exception as exc:
         logger.error("❌ Audio generation failed: %s", exc)
         raise HTTPException(status_code=500, detail="Failed to generate narration audio")
 
+    cache.set(cache_key, file_name)
     return ShortAudioResponse(audio_url=f"/audio/{file_name}")
 
+@app.post("/generate-short-audio/stream")
+async def stream_short_audio(payload: ShortAudioRequest):
+    """
+    Stream narrated audio to the client as OpenAI TTS produces it.
+
+    The stream is also written to AUDIO_DIR so /generate-short-audio can
+    reuse the finished file for the same script.
+    """
+    script = (payload.script or "").strip()
+    if not script:
+        raise HTTPException(status_code=400, detail="Script text is required")
+    if not openai_client:
+        raise HTTPException(status_code=500, detail="OPENAI_API_KEY is not configured")
+
+    cache: LLMCache = app.state.llm_cache
+    cache_key = _short_audio_cache_key(script)
+    cached_name = _cached_short_audio(cache, cache_key)
+    if cached_name:
+        return FileResponse(os.path.join(AUDIO_DIR, cached_name), media_type="audio/mpeg")
+
+    # Open the upstream stream before responding so failures still surface as a 500
+    stack = AsyncExitStack()
+    try:
+        # The concurrency slot is held for the lifetime of the stream
+        await stack.enter_async_context(OPENAI_SEM)
+        async for attempt in _provider_retrying():
+            with attempt:
+                response = await stack.enter_async_context(
+                    openai_client.audio.speech.with_streaming_response.create(
+                        model=TTS_MODEL,
+                        voice=TTS_VOICE,
+                        input=script,
+                    )
+                )
+    except Exception as exc:
+        await stack.aclose()
+        logger.error("❌ Audio stream failed to start: %s", exc)
+        raise HTTPException(status_code=500, detail="Failed to generate narration audio")
+
+    file_name = f"short_{uuid4().hex}.mp3"
+    file_path = os.path.join(AUDIO_DIR, file_name)
+    partial_path = f"{file_path}.part"
+    completed = False
+    closed = False
+
+    async def cleanup():
+        # Runs when the stream ends and again as the response's background task,
+        # which also covers clients that disconnect before the first chunk
+        nonlocal closed
+        if closed:
+            return
+        closed = True
+        try:
+            if not completed and os.path.exists(partial_path):
+                os.remove(partial_path)
+        finally:
+            await stack.aclose()
+
+    async def audio_chunks():
+        nonlocal completed
+        try:
+            with open(partial_path, "wb") as audio_file:
+                async for chunk in response.iter_bytes(chunk_size=TTS_STREAM_CHUNK_SIZE):
+                    audio_file.write(chunk)
+                    yield chunk
+            os.replace(partial_path, file_path)
+            cache.set(cache_key, file_name)
+            completed = True
+        except Exception as exc:
+            logger.error("❌ Audio stream interrupted: %s", exc)
+        finally:
+            await cleanup()
+
+    return StreamingResponse(audio_chunks(), media_type="audio/mpeg", background=BackgroundTask(cleanup))
+
+def _short_audio_cache_key(script: str) -> str:
+    return LLMCache.make_key(kind="short-audio", model=TTS_MODEL, voice=TTS_VOICE, script=script)
+
+def _cached_short_audio(cache: LLMCache, cache_key: str) -> Optional[str]:
+    """Return the cached narration file name if the file is still on disk."""
+    file_name = cache.get(cache_key)
+    if file_name and os.path.exists(os.path.join(AUDIO_DIR, file_name)):
+        return file_name
+    return None
+
+def _upload_size(file: UploadFile) -> int:
+    """Return the size of an upload from its spooled file, leaving it rewound."""
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+async def _has_pdf_signature(file: UploadFile) -> bool:
+    """Peek at the first bytes of an upload for the PDF magic number, then rewind."""
+    header = await file.read(len(PDF_MAGIC) + 1)
+    await file.seek(0)
+    return header.startswith(PDF_MAGIC)
+
+async def _validate_pdf_upload(file: UploadFile, question_count: int) -> None:
+    """Reject bad question counts and non-PDF, empty or oversized uploads."""
+    # Validate inputs
+    if question_count < 5 or question_count > 20:
+        raise HTTPException(
+            status_code=400,
+            detail="Question count must be between 5 and 20"
+        )
+    
+    # Limit file size (10MB) using the multipart size when Starlette provides it
+    upload_size = file.size if file.size is not None else _upload_size(file)
+    if upload_size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail="File size must be less than 10MB"
+        )
+    
+    if upload_size == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Uploaded file is empty"
+        )
+    
+    # Validate file type from the %PDF signature rather than the file name
+    if not await _has_pdf_signature(file):
+        raise HTTPException(
+            status_code=400,
+            detail="File must be a PDF (.pdf)"
+        )
+
+async def _extract_checked_text(source):
+    """Extract PDF text, rejecting documents without enough of it to quiz on."""
+    text, page_count = await extract_text_from_pdf_adaptive(source, app.state.pdf_pool, PDF_POOL_WORKERS)
+    
+    # Check if we got meaningful text
+    if len(text) < 100:
+        raise HTTPException(
+            status_code=400,
+            detail=f"PDF doesn't contain enough text. Only found {len(text)} characters."
+        )
+    return text, page_count
+
+async def _generate_study_set(source, language: str, question_count: int) -> ProcessResponse:
+    """Extract text from a validated PDF source and build its MCQs and flashcards."""
+    text, page_count = await _extract_checked_text(source)
+    
+    logger.info(
+        "📄 Generating %d MCQs from %d pages (%d chars) language=%s",
+        question_count, page_count, len(text), language,
+    )
+    
+    # Generate MCQs directly in the target language
+    mcqs = await make_mcqs(text, language=language, max_questions=question_count)
+    
+    logger.info("📝 Generated %d MCQs", len(mcqs))
+    if mcqs:
+        logger.debug("First question (preview): %.80s", mcqs[0]["question"])
+    
+    # Build flashcards from the generated MCQs so they match exactly
+    flashcards = [{"question": m.get("question", ""), "answer": m.get("answer", "")} for m in mcqs]
+    
+    # Validate we got some results
+    if not mcqs:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate questions from the document. Please check if GEMINI_API_KEY is set."
+        )
+    
+    # Only a short preview goes back to the client; the full text is never shipped
+    preview = text if len(text) <= PREVIEW_CHARS else f"{text[:PREVIEW_CHARS]}..."
+    return ProcessResponse(
+        preview=preview,
+        text_length=len(text),
+        page_count=page_count,
+        mcqs=mcqs,
+        flashcards=flashcards
+    )
+
 @app.post("/process-pdf", response_model=ProcessResponse)
 async def process_pdf(
     file: UploadFile = File(...),
@@ -218,111 +565,146 @@ async def process_pdf(
         question_count: Number of questions to generate (5-20)
     
     Returns:
-        ProcessResponse with extracted text, page count, MCQs and flashcards
+        ProcessResponse with a text preview, page count, MCQs and flashcards
     """
     try:
-        print(f"📥 [ENDPOINT] Received request:")
-        print(f"   File: {file.filename}")
-        print(f"   Language: {language}")
-        print(f"   Question count: {question_count}")
-        
-        # Validate inputs
-        if question_count < 5 or question_count > 20:
-            raise HTTPException(
-                status_code=400,
-                detail="Question count must be between 5 and 20"
-            )
-        
-        # Validate file type
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(
-                status_code=400,
-                detail="File must be a PDF (.pdf)"
-            )
-        
-        # Read file content
-        contents = await file.read()
-        if len(contents) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Uploaded file is empty"
-            )
-        
-        # Limit file size (10MB)
-        if len(contents) > 10 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail="File size must be less than 10MB"
-            )
-        
-        # Process PDF
-        text, page_count = extract_text_from_pdf(contents)
-        
-        # Check if we got meaningful text
-        if len(text) < 100:
-            raise HTTPException(
-                status_code=400,
-                detail=f"PDF doesn't contain enough text. Only found {len(text)} characters."
-            )
-        
-        print(f"📄 Generating {question_count} MCQs from {page_count} pages ({len(text)} chars)...")
-        print(f"🌐 Processing in language: {language}")
+        logger.info("📥 /process-pdf file=%s language=%s qcount=%d", file.filename, language, question_count)
         
-        # Generate MCQs directly in the target language
-        mcqs = make_mcqs(text, language=language, max_questions=question_count)
+        await _validate_pdf_upload(file, question_count)
         
-        print(f"📝 Generated {len(mcqs)} MCQs")
-        if mcqs:
-            print(f"   First question (preview): {mcqs[0]['question'][:80]}...")
-        
-        # Build flashcards from the generated MCQs so they match exactly
-        print(f"📚 Building {len(mcqs)} flashcards from generated MCQs in {language}...")
-        flashcards = []
-        for idx, m in enumerate(mcqs):
-            try:
-                flashcards.append({
-                    "question": m.get("question", ""),
-                    "answer": m.get("answer", "")
-                })
-            except Exception as e:
-                print(f"⚠️ Error creating flashcard for MCQ {idx}: {e}")
-                # Fallback to a simple flashcard
-                flashcards.append({
-                    "question": m.get("question", ""),
-                    "answer": m.get("answer", "")
-                })
-        
-        # Validate we got some results
-        if not mcqs:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to generate questions from the document. Please check if GEMINI_API_KEY is set."
-            )
-        
-        return ProcessResponse(
-            text=text[:500] + "..." if len(text) > 500 else text,  # Return preview
-            page_count=page_count,
-            mcqs=mcqs,
-            flashcards=flashcards
-        )
+        # Process PDF straight from the upload's temporary file
+        return await _generate_study_set(file.file, language, question_count)
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error processing PDF: {str(e)}")
+        logger.exception("❌ Error processing PDF: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.post("/process-pdf/stream")
+async def process_pdf_stream(
+    file: UploadFile = File(...),
+    language: str = Form("English"),
+    question_count: int = Form(20)
+):
+    """
+    Process a PDF and stream MCQs back as Server-Sent Events.
+    
+    Emits a ``meta`` event with the page count, one ``data`` event per MCQ
+    as soon as it is generated, then a ``done`` event with the total.
+    """
+    await _validate_pdf_upload(file, question_count)
+    text, page_count = await _extract_checked_text(file.file)
+    
+    async def events():
+        yield f"event: meta\ndata: {orjson.dumps({'page_count': page_count}).decode()}\n\n"
+        count = 0
+        async for mcq in make_mcqs_stream(text, language=language, max_questions=question_count):
+            count += 1
+            yield f"data: {orjson.dumps(mcq).decode()}\n\n"
+        yield f"event: done\ndata: {orjson.dumps({'count': count}).decode()}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _job_idempotency_key(source: BinaryIO, language: str, question_count: int) -> str:
+    """Hash the upload contents and generation options, leaving the file rewound."""
+    digest = hashlib.sha256()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    source.seek(0)
+    digest.update(f"|{language.lower()}|{question_count}".encode("utf-8"))
+    return digest.hexdigest()
+
+def _save_job_upload(source: BinaryIO, path: str) -> None:
+    source.seek(0)
+    with open(path, "wb") as job_file:
+        shutil.copyfileobj(source, job_file, UPLOAD_CHUNK_SIZE)
+
+def _fail_job(job_id: str, detail: str) -> None:
+    """Record a failed job and let the same upload be retried as a fresh job."""
+    failed = JobResponse(job_id=job_id, status=JobStatus.FAILED, error=detail)
+    app.state.jobs.finish(job_id, failed.model_dump_json(), release_key=True)
+
+def _stale_job_payload(job_id: str) -> str:
+    return JobResponse(job_id=job_id, status=JobStatus.FAILED, error="Job was interrupted; please retry").model_dump_json()
+
+async def _process_job(job_id: str, path: str, language: str, question_count: int) -> None:
+    jobs: JobStore = app.state.jobs
+    try:
+        with open(path, "rb") as source:
+            result = await _generate_study_set(source, language, question_count)
+        completed = JobResponse(job_id=job_id, status=JobStatus.COMPLETED, result=result)
+        jobs.finish(job_id, completed.model_dump_json())
+    except asyncio.CancelledError:
+        logger.warning("❌ Job %s cancelled", job_id)
+        _fail_job(job_id, "Job was interrupted; please retry")
+        raise
+    except Exception as exc:
+        detail = exc.detail if isinstance(exc, HTTPException) else f"Internal server error: {exc}"
+        logger.warning("❌ Job %s failed: %s", job_id, detail)
+        _fail_job(job_id, str(detail))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        jobs.prune(MAX_STORED_JOBS)
+
+@app.post("/process-pdf/jobs", response_model=JobResponse, status_code=202)
+async def create_process_pdf_job(
+    file: UploadFile = File(...),
+    language: str = Form("English"),
+    question_count: int = Form(20)
+):
+    """
+    Queue a PDF for MCQ/flashcard generation and return immediately.
+    
+    Poll GET /jobs/{job_id} for the result; job state lives in SQLite, so
+    any worker can answer. Re-uploading the same file with the same options
+    returns the existing job instead of starting a new one.
+    """
+    await _validate_pdf_upload(file, question_count)
+    
+    idempotency_key = await run_in_threadpool(_job_idempotency_key, file.file, language, question_count)
+    job = JobResponse(job_id=uuid4().hex, status=JobStatus.PROCESSING)
+    owner_id, payload = app.state.jobs.claim(idempotency_key, job.job_id, job.model_dump_json())
+    if owner_id != job.job_id:
+        return JobResponse.model_validate_json(payload)
+    
+    path = os.path.join(JOBS_DIR, f"{job.job_id}.pdf")
+    try:
+        await run_in_threadpool(_save_job_upload, file.file, path)
+    except Exception as exc:
+        _fail_job(job.job_id, f"Internal server error: {exc}")
+        raise HTTPException(status_code=500, detail="Failed to store the upload")
+    
+    task = asyncio.create_task(_process_job(job.job_id, path, language, question_count))
+    app.state.job_tasks.add(task)
+    task.add_done_callback(app.state.job_tasks.discard)
+    return job
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Return the status (and, once finished, the result) of a PDF job."""
+    payload = app.state.jobs.get(job_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.model_validate_json(payload)
+
 @app.post("/test-mcq")
 async def test_mcq_generation(text: str, language: str = "English", question_count: int = 5):
     """
     Test MCQ generation directly from text.
     """
     try:
-        print(f"🧪 Testing MCQ generation with {len(text)} chars in {language}...")
-        mcqs = make_mcqs(text, language=language, max_questions=question_count)
+        logger.info("🧪 Testing MCQ generation with %d chars in %s", len(text), language)
+        mcqs = await make_mcqs(text, language=language, max_questions=question_count)
         
         return {
             "text_preview": text[:200] + "..." if len(text) > 200 else text,
@@ -338,6 +720,15 @@ if __name__ == "__main__":
     port = int(os.getenv("BACKEND_PORT", 8000))
     host = os.getenv("BACKEND_HOST", "0.0.0.0")
     
-    print(f"🚀 Starting Quillium backend on {host}:{port}")
-    print(f"🔑 GEMINI_API_KEY set: {'Yes' if os.getenv('GEMINI_API_KEY') else 'No'}")
-    uvicorn.run(app, host=host, port=port)
+    logger.info("🚀 Starting Quillium backend on %s:%s", host, port)
+    logger.info("🔑 GEMINI_API_KEY set: %s", "Yes" if GEMINI_API_KEY else "No")
+    # uvloop has no Windows build; fall back to the stdlib loop there
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        log_config=None,
+    )
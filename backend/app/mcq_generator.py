@@ -1,101 +1,304 @@
+import asyncio
 import logging
 import os
-import json
 import re
-from typing import List, Dict, Optional
+from functools import lru_cache
+from itertools import islice
+from typing import AsyncIterator, Iterator, List, Dict, Optional, Tuple
 
 import google.generativeai as genai
+import orjson
+from tenacity import AsyncRetrying, Retrying
 
+from .cache import LLMCache, ResponseCache
+from .gemini import GEMINI_RETRY_POLICY, GEMINI_SEM, configure_gemini, gemini_api_key, generate_content
+from .json_stream import JsonObjectStream
+
+mcq_logger = logging.getLogger("quillium.mcq")
 shorts_logger = logging.getLogger("quillium.shorts")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+MCQ_MODEL = "gemini-2.5-flash-lite"
+# Bump whenever the MCQ or translation prompts change so stale cached responses are ignored
+MCQ_PROMPT_VERSION = 3
+# Generated and translated MCQs keyed by model, prompt version and input
+MCQ_CACHE = ResponseCache(ttl_seconds=86400, max_entries=1024)
+
+# Shared by MCQ, translation and shorts calls; built on first use
+_MODEL: Optional[genai.GenerativeModel] = None
+
+# Concurrent per-MCQ translation calls allowed at once
+TRANSLATION_CONCURRENCY = 8
+# Sets at least this large are translated in one batched request first
+TRANSLATION_BATCH_MIN = 4
+TRANSLATION_BATCH_MAX_OUTPUT_TOKENS = 8192
+
+# Options containing any of these are too vague to be useful distractors
+VAGUE_TERMS = (
+    "wrong", "incorrect", "not correct", "false", "invalid",
+    "different concept", "alternative perspective", "common misconception",
+    "broader interpretation", "related but different", "someone else",
+    "not this", "other answer", "another option",
+)
+VAGUE_OPTION_RE = re.compile("|".join(map(re.escape, VAGUE_TERMS)), re.IGNORECASE)
+
+# Filler options for MCQs left with fewer than 4 usable options, by question kind
+FILLER_PEOPLE = ("Alan Turing", "Isaac Newton", "Marie Curie", "Charles Darwin")
+FILLER_CAPITALS = ("London", "Berlin", "Tokyo", "Beijing")
+FILLER_YEARS = ("1945", "1969", "1776", "2001")
+FILLER_GENERIC = (
+    "A related concept from the same field",
+    "An important but different aspect",
+    "A frequently confused alternative",
+    "A similar but distinct element",
+)
+DATE_QUESTION_RE = re.compile("year|when|date")
+
+SENTENCE_END_RE = re.compile(r"[.!?]")
+JSON_ARRAY_START_RE = re.compile(r"\[\s*\{")
+# A leading ```lang fence and/or a trailing ``` fence
+CODE_FENCE_RE = re.compile(r"^```[a-zA-Z]*|```\s*$")
+WHITESPACE_RE = re.compile(r"\s+")
+
+ENGLISH_MCQ_GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "max_output_tokens": 4000,
+}
+
+
+def _gemini_model(api_key: Optional[str] = None) -> genai.GenerativeModel:
+    """
+    Return the module's Gemini model.
+
+    The SDK is (re)configured whenever ``api_key`` or the environment's key
+    differs from the one it was configured with, so keys set after import work.
+    """
+    global _MODEL
+    configure_gemini(api_key)
+    if _MODEL is None:
+        _MODEL = genai.GenerativeModel(MCQ_MODEL)
+    return _MODEL
 
 
 def init_translator():
     """Dummy function to maintain compatibility with existing imports."""
-    print("✅ Translator initialized (using Gemini for translations)")
+    mcq_logger.info("✅ Translator initialized (using Gemini for translations)")
     return None
 
 
-def make_mcqs(text: str, language: str = "English", max_questions: int = 20) -> List[Dict]:
-    """Generate MCQs in English first, then translate to target language."""
+async def make_mcqs(text: str, language: str = "English", max_questions: int = 20) -> List[Dict]:
+    """
+    Generate MCQs in the target language.
 
-    print(f"\n{'='*70}")
-    print(f"🔧 MAKE_MCQS: Starting with language='{language}', max_questions={max_questions}")
-    print(f"{'='*70}")
+    Non-English requests are answered by a single localized Gemini call;
+    if that yields nothing usable, MCQs are generated in English first and
+    then translated.
+    """
+
+    mcq_logger.info("🔧 make_mcqs: language=%s max_questions=%d", language, max_questions)
 
     # Clean text
     text = text.strip()
     if len(text) < 50:
-        print("❌ Text too short (< 50 chars)")
+        mcq_logger.warning("❌ Text too short (< 50 chars)")
         return []
 
     # If text is too long, truncate it
     if len(text) > 6000:
-        print(f"⚠️ Text too long ({len(text)} chars), truncating to 6000")
+        mcq_logger.info("⚠️ Text too long (%d chars), truncating to 6000", len(text))
         text = text[:6000] + "... [text truncated]"
 
     # Get API key
-    api_key = GEMINI_API_KEY
+    api_key = gemini_api_key()
     if not api_key:
-        print("❌ GEMINI_API_KEY not found in environment variables!")
-        print("   Please set GEMINI_API_KEY in your .env file")
+        mcq_logger.error("❌ GEMINI_API_KEY not found in environment variables; set it in your .env file")
         return generate_fallback_mcqs(text, max_questions)
 
-    print(f"✓ API key loaded: {api_key[:20]}...")
-
     try:
-        # Step 1: ALWAYS generate in English first
-        print("📝 Step 1: Generating MCQs in English...")
-        english_mcqs = generate_english_mcqs(text, max_questions, api_key)
+        # One call straight into the target language saves a translation round-trip per MCQ
+        if language.lower() != "english":
+            mcq_logger.debug("📝 Generating MCQs directly in %s...", language)
+            localized_mcqs = await generate_mcqs_in_language(text, language, max_questions, api_key)
+            if localized_mcqs:
+                mcq_logger.info("✅ Generated %d MCQs in %s", len(localized_mcqs), language)
+                return localized_mcqs[:max_questions]
+            mcq_logger.warning("⚠️ Direct %s generation failed, falling back to English + translation", language)
+
+        # Step 1: generate in English first
+        mcq_logger.debug("📝 Step 1: Generating MCQs in English...")
+        english_mcqs = await generate_english_mcqs(text, max_questions, api_key)
 
         if not english_mcqs:
-            print("❌ Failed to generate English MCQs")
+            mcq_logger.warning("❌ Failed to generate English MCQs")
             return generate_fallback_mcqs(text, max_questions)
 
-        print(f"✅ Step 1 Complete: Generated {len(english_mcqs)} English MCQs")
-
-        # Log first English question as reference
-        if english_mcqs:
-            print(f"   First Q (EN): {english_mcqs[0]['question'][:60]}...")
+        mcq_logger.info("✅ Step 1 Complete: Generated %d English MCQs", len(english_mcqs))
+        mcq_logger.debug("   First Q (EN): %.60s...", english_mcqs[0]['question'])
 
         # Step 2: If language is English, return as is
         if language.lower() == "english":
-            print(f"✅ Language is English, returning MCQs as-is")
+            mcq_logger.debug("✅ Language is English, returning MCQs as-is")
             return english_mcqs[:max_questions]
 
         # Step 3: Translate to target language
-        print(f"🌍 Step 2: Translating {len(english_mcqs)} MCQs to {language}...")
-        translated_mcqs = translate_mcqs_to_language(english_mcqs, language, api_key)
+        mcq_logger.info("🌍 Step 2: Translating %d MCQs to %s...", len(english_mcqs), language)
+        translated_mcqs = await translate_mcqs_to_language(english_mcqs, language, api_key)
 
         if translated_mcqs and len(translated_mcqs) > 0:
-            print(f"✅ Step 2 Complete: Translated to {language}")
+            mcq_logger.info("✅ Step 2 Complete: Translated to %s", language)
 
             # Verify translation actually happened
             if translated_mcqs[0]['question'] != english_mcqs[0]['question']:
-                print(f"   ✓ Confirmed: Question was translated")
-                print(f"   First Q ({language}): {translated_mcqs[0]['question'][:60]}...")
+                mcq_logger.debug("   First Q (%s): %.60s...", language, translated_mcqs[0]['question'])
             else:
-                print(f"   ⚠️ Warning: Question appears unchanged after translation")
+                mcq_logger.warning("   ⚠️ Question appears unchanged after translation")
 
             return translated_mcqs[:max_questions]
         else:
-            print(f"⚠️ Translation returned empty, using English MCQs")
+            mcq_logger.warning("⚠️ Translation returned empty, using English MCQs")
             return english_mcqs[:max_questions]
 
     except Exception as e:
-        print(f"❌ Error in make_mcqs: {e}")
-        import traceback
-        traceback.print_exc()
+        mcq_logger.exception("❌ Error in make_mcqs: %s", e)
         return generate_fallback_mcqs(text, max_questions)
 
 
-def generate_english_mcqs(text: str, max_questions: int, api_key: str) -> List[Dict]:
+async def generate_english_mcqs(text: str, max_questions: int, api_key: str) -> List[Dict]:
     """Generate MCQs in English using Gemini."""
+    cache_key = LLMCache.make_key(
+        kind="english-mcqs",
+        model=MCQ_MODEL,
+        prompt_version=MCQ_PROMPT_VERSION,
+        text=text,
+        max_questions=max_questions,
+    )
+    cached = MCQ_CACHE.get(cache_key)
+    if cached is not None:
+        mcq_logger.debug("✅ Using cached English MCQs")
+        return orjson.loads(cached)
+
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = _gemini_model(api_key)
+
+        prompt = _build_english_mcq_prompt(_select_salient(text, max_questions * 3), max_questions)
+
+        mcq_logger.debug("🤖 Generating English MCQs with Gemini...")
+
+        validated_mcqs = await _collect_streamed_mcqs(model, prompt, max_questions)
+
+        mcq_logger.debug("✅ Validated %d English MCQs", len(validated_mcqs))
+        if validated_mcqs:
+            MCQ_CACHE.set(cache_key, orjson.dumps(validated_mcqs).decode())
+        return validated_mcqs
+
+    except Exception as e:
+        mcq_logger.error("❌ Error generating English MCQs: %s", e)
+        return []
+
+
+async def generate_mcqs_in_language(text: str, language: str, max_questions: int, api_key: str) -> List[Dict]:
+    """Generate MCQs written directly in ``language`` with a single Gemini call."""
+    cache_key = LLMCache.make_key(
+        kind="localized-mcqs",
+        model=MCQ_MODEL,
+        prompt_version=MCQ_PROMPT_VERSION,
+        text=text,
+        language=language,
+        max_questions=max_questions,
+    )
+    cached = MCQ_CACHE.get(cache_key)
+    if cached is not None:
+        mcq_logger.debug("✅ Using cached %s MCQs", language)
+        return orjson.loads(cached)
+
+    try:
+        model = _gemini_model(api_key)
+
+        mcq_logger.debug("🤖 Generating %s MCQs with Gemini...", language)
+
+        validated_mcqs = await _collect_streamed_mcqs(
+            model,
+            _build_localized_mcq_prompt(_select_salient(text, max_questions * 3), max_questions, language),
+            max_questions,
+            allow_fillers=False,
+        )
+
+        mcq_logger.debug("✅ Validated %d %s MCQs", len(validated_mcqs), language)
+        if validated_mcqs:
+            MCQ_CACHE.set(cache_key, orjson.dumps(validated_mcqs).decode())
+        return validated_mcqs
+
+    except Exception as e:
+        mcq_logger.error("❌ Error generating %s MCQs: %s", language, e)
+        return []
+
+
+async def _collect_streamed_mcqs(model, prompt: str, max_questions: int, allow_fillers: bool = True) -> List[Dict]:
+    """
+    Stream an MCQ prompt and validate each MCQ as soon as its object closes.
+
+    Stops reading the stream once ``max_questions`` valid MCQs are in. A
+    transient Gemini error, even mid-stream, restarts the whole request
+    under GEMINI_RETRY_POLICY instead of returning a partial set.
+    ``allow_fillers`` is passed through to validate_mcq. Each attempt holds
+    GEMINI_SEM until its stream is done.
+    """
+    async for attempt in AsyncRetrying(**GEMINI_RETRY_POLICY):
+        with attempt:
+            async with GEMINI_SEM:
+                response = await model.generate_content_async(
+                    prompt,
+                    generation_config=ENGLISH_MCQ_GENERATION_CONFIG,
+                    stream=True,
+                )
+                parser = JsonObjectStream()
+                validated_mcqs: List[Dict] = []
+                async for chunk in response:
+                    for item in parser.feed(_chunk_text(chunk)):
+                        mcq = validate_mcq(item, allow_fillers)
+                        if not mcq:
+                            continue
+                        validated_mcqs.append(mcq)
+                        if len(validated_mcqs) >= max_questions:
+                            return validated_mcqs
+                return validated_mcqs
+
+
+def _select_salient(text: str, k: int) -> str:
+    """
+    Keep only the ``k`` most informative sentences of ``text``, in their original order.
+
+    Repeated sentences (page headers and footers, typically) are kept once,
+    then sentences are scored by length times (1 + capitalized words), a cheap
+    proxy for named entities and terms. Text with ``k`` sentences or fewer is
+    returned as-is.
+    """
+    sentences = list(_iter_sentences(text, keep_punctuation=True))
+    if len(sentences) <= k:
+        return text
+    first_seen: Dict[str, str] = {}
+    for sentence in sentences:
+        first_seen.setdefault(" ".join(sentence.lower().split()), sentence)
+    unique = list(first_seen.values())
+    scores = [len(s) * (1 + sum(word[:1].isupper() for word in s.split())) for s in unique]
+    top = sorted(sorted(range(len(unique)), key=scores.__getitem__, reverse=True)[:k])
+    return " ".join(unique[i] for i in top)
+
+
+def _build_localized_mcq_prompt(text: str, max_questions: int, language: str) -> str:
+    """Build the MCQ prompt asking for questions, answers and options written in ``language``."""
+    return _build_english_mcq_prompt(text, max_questions) + f"""
+LANGUAGE:
+Write every question, answer and option in {language}, even though the examples above are in English.
+Keep the JSON keys and the "difficulty" value exactly as shown, in lowercase English.
+Each answer must match one of its options exactly.
+
+Return ONLY the JSON array. No explanations.
+"""
+
 
-        prompt = f"""
+def _build_english_mcq_prompt(text: str, max_questions: int) -> str:
+    """Build the Gemini prompt asking for a JSON array of English MCQs."""
+    return f"""
 Generate exactly {max_questions} multiple choice questions (MCQs) from the following text.
 Each question MUST have exactly 4 options, with ONE correct answer.
 
@@ -127,71 +330,148 @@ TEXT:
 Return ONLY the JSON array. No explanations.
 """
 
-        print("🤖 Generating English MCQs with Gemini...")
 
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.3,
-                "max_output_tokens": 4000,
-            }
+async def translate_mcqs_to_language(english_mcqs: List[Dict], target_lang: str, api_key: str) -> List[Dict]:
+    """Translate English MCQs to the target language, one concurrent Gemini call per MCQ."""
+    if target_lang.lower() == "english" or not english_mcqs:
+        mcq_logger.debug("⏭️ [TRANSLATE] Skipping translation - target is English or no MCQs")
+        return english_mcqs
+
+    try:
+        model = _gemini_model(api_key)
+
+        mcq_logger.info("[TRANSLATE] Starting translation of %d MCQs to %s", len(english_mcqs), target_lang)
+
+        cache_keys = [_translation_cache_key(mcq, target_lang) for mcq in english_mcqs]
+        translated: Dict[int, Dict] = {}
+        for i, key in enumerate(cache_keys):
+            cached = MCQ_CACHE.get(key)
+            if cached is not None:
+                translated[i] = orjson.loads(cached)
+        pending = [i for i in range(len(english_mcqs)) if i not in translated]
+        if translated:
+            mcq_logger.debug("  ✅ %d MCQs served from the translation cache", len(translated))
+
+        # Larger sets go out as one batched request; anything it misses is retried per MCQ
+        if len(pending) >= TRANSLATION_BATCH_MIN:
+            batched = await _translate_batch(model, [english_mcqs[i] for i in pending], target_lang)
+            for j, item in batched.items():
+                translated[pending[j]] = item
+            pending = [i for i in pending if i not in translated]
+
+        # Translate the rest individually for better reliability, bounded to respect Gemini RPM limits
+        sem = asyncio.Semaphore(TRANSLATION_CONCURRENCY)
+        results = await asyncio.gather(
+            *(_translate_one(model, english_mcqs[i], target_lang, sem) for i in pending),
+            return_exceptions=True,
         )
+        for i, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                mcq_logger.warning("  ❌ Error: %s", result)
+                translated[i] = english_mcqs[i]
+            else:
+                translated[i] = result
+        translated_mcqs = [translated[i] for i in range(len(english_mcqs))]
 
-        raw_output = response.text.strip()
-        print(f"✅ Received Gemini response")
+        # Only cache real translations, never the English fallback
+        for i, (mcq, translated_mcq) in enumerate(zip(english_mcqs, translated_mcqs)):
+            if _is_translated(mcq, translated_mcq):
+                MCQ_CACHE.set(cache_keys[i], orjson.dumps(translated_mcq).decode())
 
-        # Clean JSON
-        raw_output = clean_json_response(raw_output)
+        mcq_logger.info("✅ [TRANSLATE] Complete: %d MCQs processed for %s", len(translated_mcqs), target_lang)
 
-        # Parse JSON
-        try:
-            mcqs = json.loads(raw_output)
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse JSON: {e}")
-            print(f"Raw output preview: {raw_output[:500]}")
-            return []
+        # Verify at least some translations happened
+        orig_first = english_mcqs[0]['question']
+        trans_first = translated_mcqs[0]['question']
 
-        # Validate each MCQ
-        validated_mcqs = []
-        for mcq in mcqs[:max_questions]:
-            validated = validate_mcq(mcq)
-            if validated:
-                validated_mcqs.append(validated)
+        if orig_first.lower() == trans_first.lower():
+            mcq_logger.warning("⚠️ [TRANSLATE] First question unchanged: %s", orig_first)
+        else:
+            mcq_logger.debug("✓ [TRANSLATE] EN: %.60s... %s: %.60s...", orig_first, target_lang, trans_first)
 
-        print(f"✅ Validated {len(validated_mcqs)} English MCQs")
-        return validated_mcqs
+        return translated_mcqs
 
     except Exception as e:
-        print(f"❌ Error generating English MCQs: {e}")
-        return []
+        mcq_logger.exception("❌ [TRANSLATE] Fatal error, returning English MCQs as fallback: %s", e)
+        return english_mcqs
 
 
-def translate_mcqs_to_language(english_mcqs: List[Dict], target_lang: str, api_key: str) -> List[Dict]:
-    """Translate English MCQs to target language using a simpler, more reliable approach."""
-    if target_lang.lower() == "english" or not english_mcqs:
-        print(f"⏭️ [TRANSLATE] Skipping translation - target is English or no MCQs")
-        return english_mcqs
+def translate_mcqs_to_language_sync(english_mcqs: List[Dict], target_lang: str, api_key: str) -> List[Dict]:
+    """Blocking wrapper around translate_mcqs_to_language for callers without an event loop."""
+    return asyncio.run(translate_mcqs_to_language(english_mcqs, target_lang, api_key))
+
+
+async def _translate_batch(model, english_mcqs: List[Dict], target_lang: str) -> Dict[int, Dict]:
+    """
+    Translate many MCQs in a single Gemini request.
+
+    Each MCQ is sent with a ``custom_id`` and results are mapped back by it;
+    returns {index: translated MCQ} for the items that came back usable.
+    """
+    requests = [{"custom_id": f"mcq-{i}", **mcq} for i, mcq in enumerate(english_mcqs)]
+    prompt = f"""You MUST translate these MCQs to {target_lang}. Output ONLY JSON.
+
+STRICT INSTRUCTIONS:
+- Translate the ENTIRE question, answer and EVERY option of each MCQ to {target_lang}
+- Make sure each translated answer matches one of its translated options
+- Keep "custom_id" and "difficulty" exactly as-is
+- Return one object per input MCQ, as a JSON array
+- ONLY return valid JSON, no explanations
+
+MCQs to translate:
+{orjson.dumps(requests).decode()}"""
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        response = await generate_content(
+            model,
+            prompt,
+            generation_config={
+                "temperature": 0.2,
+                "max_output_tokens": TRANSLATION_BATCH_MAX_OUTPUT_TOKENS,
+            }
+        )
+        items = orjson.loads(clean_json_response(response.text.strip()))
+    except Exception as e:
+        mcq_logger.warning("  ❌ Batch translation failed, translating individually: %s", e)
+        return {}
 
-        print(f"\n{'='*70}")
-        print(f"[TRANSLATE] Starting translation of {len(english_mcqs)} MCQs to {target_lang}")
-        print(f"{'='*70}\n")
+    by_id = {f"mcq-{i}": i for i in range(len(english_mcqs))}
+    translated: Dict[int, Dict] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        index = by_id.get(item.pop("custom_id", None))
+        if index is not None and index not in translated and _is_translated(english_mcqs[index], item):
+            translated[index] = item
 
-        # Translate each MCQ individually for better reliability
-        translated_mcqs = []
+    mcq_logger.debug("  ✅ Batch translated %d/%d MCQs", len(translated), len(english_mcqs))
+    return translated
+
+
+def _translation_cache_key(mcq: Dict, target_lang: str) -> str:
+    return LLMCache.make_key(
+        kind="mcq-translation",
+        model=MCQ_MODEL,
+        prompt_version=MCQ_PROMPT_VERSION,
+        mcq=mcq,
+        target_lang=target_lang,
+    )
 
-        for idx, mcq in enumerate(english_mcqs):
-            try:
-                print(f"[TRANSLATE] MCQ {idx + 1}/{len(english_mcqs)}")
-                print(f"  EN Question: {mcq['question'][:60]}...")
 
-                # Build individual translation prompt - ULTRA EXPLICIT
-                prompt = f"""You MUST translate this MCQ to {target_lang}. Output ONLY JSON.
+def _is_translated(mcq: Dict, translated_mcq: Dict) -> bool:
+    """True if a translation has every MCQ field and actually differs from the English question."""
+    if not all(k in translated_mcq for k in ['question', 'answer', 'options']):
+        return False
+    return str(translated_mcq['question']).lower() != mcq['question'].lower()
 
-English question: {mcq['question']}
+
+@lru_cache(maxsize=64)
+def _translation_prompt_parts(target_lang: str) -> Tuple[str, str, str]:
+    """Static pieces of the per-MCQ translation prompt, built once per language."""
+    prefix = f"""You MUST translate this MCQ to {target_lang}. Output ONLY JSON.
+
+English question: """
+    middle = f"""
 
 STRICT INSTRUCTIONS:
 - Translate the ENTIRE question to {target_lang}
@@ -202,7 +482,8 @@ STRICT INSTRUCTIONS:
 - ONLY return valid JSON, no explanations
 
 Here is the English MCQ to translate:
-{json.dumps(mcq, ensure_ascii=False)}
+"""
+    suffix = f"""
 
 Return ONLY this JSON format with translations in {target_lang}:
 {{
@@ -211,100 +492,163 @@ Return ONLY this JSON format with translations in {target_lang}:
   "options": ["[TRANSLATE]", "[TRANSLATE]", "[TRANSLATE]", "[TRANSLATE]"],
   "difficulty": "[KEEP SAME]"
 }}"""
+    return prefix, middle, suffix
 
-                response = model.generate_content(
-                    prompt,
-                    generation_config={
-                        "temperature": 0.2,
-                        "max_output_tokens": 1000,
-                    }
-                )
 
-                raw_output = response.text.strip()
-                print(f"  Raw response: {raw_output[:100]}...")
-
-                # Clean JSON
-                raw_output = clean_json_response(raw_output)
-
-                # Parse
-                try:
-                    translated_mcq = json.loads(raw_output)
-
-                    # Validate
-                    if all(k in translated_mcq for k in ['question', 'answer', 'options']):
-                        # Double check it's actually translated
-                        orig_q = mcq['question'].lower()
-                        trans_q = translated_mcq['question'].lower()
-
-                        if orig_q != trans_q:
-                            print(f"  ✅ Translated: {translated_mcq['question'][:60]}...")
-                            translated_mcqs.append(translated_mcq)
-                        else:
-                            print(f"  ⚠️ Not actually translated, using English")
-                            translated_mcqs.append(mcq)
-                    else:
-                        print(f"  ❌ Missing fields in response")
-                        translated_mcqs.append(mcq)
-
-                except json.JSONDecodeError as e:
-                    print(f"  ❌ JSON parse error: {e}")
-                    print(f"     Response was: {raw_output[:200]}")
-                    translated_mcqs.append(mcq)
+async def _translate_one(model, mcq: Dict, target_lang: str, sem: asyncio.Semaphore) -> Dict:
+    """Translate a single MCQ; returns the English MCQ unchanged if translation fails."""
+    mcq_logger.debug("[TRANSLATE] EN Question: %.60s...", mcq['question'])
+
+    # Build individual translation prompt - ULTRA EXPLICIT
+    prefix, middle, suffix = _translation_prompt_parts(target_lang)
+    prompt = prefix + mcq['question'] + middle + orjson.dumps(mcq).decode() + suffix
+
+    async with sem:
+        response = await generate_content(
+            model,
+            prompt,
+            generation_config={
+                "temperature": 0.2,
+                "max_output_tokens": 1000,
+            }
+        )
+
+    raw_output = response.text.strip()
+    mcq_logger.debug("  Raw response: %.100s...", raw_output)
+
+    # Clean JSON
+    raw_output = clean_json_response(raw_output)
+
+    # Parse
+    try:
+        translated_mcq = orjson.loads(raw_output)
+    except orjson.JSONDecodeError as e:
+        mcq_logger.warning("  ❌ JSON parse error: %s; response was: %.200s", e, raw_output)
+        return mcq
+
+    # Validate
+    if not all(k in translated_mcq for k in ['question', 'answer', 'options']):
+        mcq_logger.warning("  ❌ Missing fields in response")
+        return mcq
+
+    # Double check it's actually translated
+    if mcq['question'].lower() == translated_mcq['question'].lower():
+        mcq_logger.warning("  ⚠️ Not actually translated, using English")
+        return mcq
 
+    mcq_logger.debug("  ✅ Translated: %.60s...", translated_mcq['question'])
+    return translated_mcq
+
+
+async def make_mcqs_stream(text: str, language: str = "English", max_questions: int = 20) -> AsyncIterator[Dict]:
+    """
+    Yield validated MCQs one at a time as Gemini streams them.
+
+    Like make_mcqs, non-English MCQs are first generated directly in
+    ``language``; if that yields nothing, English MCQs are streamed and each
+    one is translated as soon as it is complete. Falls back to simple MCQs
+    if nothing could be generated.
+    """
+    text = text.strip()
+    if len(text) < 50:
+        return
+    if len(text) > 6000:
+        text = text[:6000] + "... [text truncated]"
+
+    produced = 0
+    localized = language.lower() != "english"
+    api_key = gemini_api_key()
+    if api_key:
+        salient = _select_salient(text, max_questions * 3)
+        if localized:
+            try:
+                prompt = _build_localized_mcq_prompt(salient, max_questions, language)
+                async for mcq in _stream_mcqs(prompt, max_questions, allow_fillers=False):
+                    yield mcq
+                    produced += 1
             except Exception as e:
-                print(f"  ❌ Error: {e}")
-                translated_mcqs.append(mcq)
+                mcq_logger.error("❌ Error streaming %s MCQs: %s", language, e)
+            if produced == 0:
+                mcq_logger.warning("⚠️ Direct %s streaming failed, falling back to English + translation", language)
 
-        print(f"\n{'='*70}")
-        print(f"✅ [TRANSLATE] Complete: {len(translated_mcqs)} MCQs processed for {target_lang}")
-        print(f"{'='*70}\n")
+        if produced == 0:
+            try:
+                async for mcq in _stream_mcqs(_build_english_mcq_prompt(salient, max_questions), max_questions):
+                    if localized:
+                        translated = await translate_mcqs_to_language([mcq], language, api_key)
+                        mcq = translated[0] if translated else mcq
+                    yield mcq
+                    produced += 1
+            except Exception as e:
+                mcq_logger.error("❌ Error streaming MCQs: %s", e)
+    else:
+        mcq_logger.error("❌ GEMINI_API_KEY not found in environment variables!")
 
-        # Verify at least some translations happened
-        orig_first = english_mcqs[0]['question']
-        trans_first = translated_mcqs[0]['question']
+    if produced == 0:
+        for mcq in generate_fallback_mcqs(text, max_questions):
+            yield mcq
 
-        if orig_first.lower() == trans_first.lower():
-            print(f"⚠️ [TRANSLATE] WARNING: First question unchanged!")
-            print(f"   EN: {orig_first}")
-            print(f"   TR: {trans_first}")
-        else:
-            print(f"✓ [TRANSLATE] Confirmed translation happened")
-            print(f"   EN: {orig_first[:60]}...")
-            print(f"   {target_lang}: {trans_first[:60]}...")
 
-        return translated_mcqs
+async def _stream_mcqs(prompt: str, max_questions: int, allow_fillers: bool = True) -> AsyncIterator[Dict]:
+    """
+    Yield up to ``max_questions`` validated MCQs from a streamed Gemini reply.
 
-    except Exception as e:
-        print(f"❌ [TRANSLATE] Fatal error: {e}")
-        import traceback
-        traceback.print_exc()
-        print(f"⚠️ [TRANSLATE] Returning English MCQs as fallback")
-        return english_mcqs
+    GEMINI_SEM is released once the stream opens: callers translate MCQs
+    between yields, and those calls need the semaphore too.
+    """
+    response = await generate_content(
+        _gemini_model(),
+        prompt,
+        generation_config=ENGLISH_MCQ_GENERATION_CONFIG,
+        stream=True,
+    )
+    parser = JsonObjectStream()
+    produced = 0
+    async for chunk in response:
+        for item in parser.feed(_chunk_text(chunk)):
+            mcq = validate_mcq(item, allow_fillers)
+            if not mcq:
+                continue
+            yield mcq
+            produced += 1
+            if produced >= max_questions:
+                return
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed response chunk; empty for chunks without text parts."""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
 
 
 def clean_json_response(raw_output: str) -> str:
     """Clean and extract JSON from Gemini response."""
     # Remove markdown code blocks
-    if raw_output.startswith("```json"):
-        raw_output = raw_output[7:]
-    elif raw_output.startswith("```"):
-        raw_output = raw_output[3:]
-
-    if raw_output.endswith("```"):
-        raw_output = raw_output[:-3]
+    raw_output = CODE_FENCE_RE.sub("", raw_output).strip()
 
-    raw_output = raw_output.strip()
+    # Usually the reply is already a bare JSON array
+    if raw_output.startswith("[") and raw_output.endswith("]"):
+        return raw_output
 
-    # Extract JSON array if wrapped in text
-    json_match = re.search(r'\[\s*\{.*?\}\s*\]', raw_output, re.DOTALL)
-    if json_match:
-        raw_output = json_match.group(0)
+    # Extract JSON array of objects if wrapped in text: first "[{" through the last "]"
+    start = JSON_ARRAY_START_RE.search(raw_output)
+    if start:
+        end = raw_output.rfind("]")
+        if end > start.start():
+            raw_output = raw_output[start.start():end + 1]
 
     return raw_output
 
 
-def validate_mcq(mcq: Dict) -> Optional[Dict]:
-    """Validate and clean a single MCQ."""
+def validate_mcq(mcq: Dict, allow_fillers: bool = True) -> Optional[Dict]:
+    """
+    Validate and clean a single MCQ.
+
+    Missing options are padded with English fillers; MCQs written in another
+    language pass ``allow_fillers=False`` and are rejected instead.
+    """
     if not mcq or not isinstance(mcq, dict):
         return None
 
@@ -321,54 +665,29 @@ def validate_mcq(mcq: Dict) -> Optional[Dict]:
     if len(options) < 4:
         return None
 
-    # Ensure answer is in options
+    # Ensure answer is in options: match case-insensitively (earliest option wins),
+    # else use the first option
     if answer not in options:
-        # Check case-insensitive match
-        answer_lower = answer.lower()
-        for opt in options:
-            if opt.lower() == answer_lower:
-                answer = opt  # Update to match case
-                break
-        else:
-            # If still not found, use first option
-            answer = options[0]
-
-    # Clean options - remove vague ones
-    cleaned_options = []
-    seen = set()
-
-    vague_terms = [
-        "wrong", "incorrect", "not correct", "false", "invalid",
-        "different concept", "alternative perspective", "common misconception",
-        "broader interpretation", "related but different", "someone else",
-        "not this", "other answer", "another option"
-    ]
-
-    for opt in options:
-        opt_str = str(opt).strip()
-        if not opt_str:
-            continue
-
-        opt_lower = opt_str.lower()
-
-        # Skip if too vague
-        if any(term in opt_lower for term in vague_terms):
-            continue
-
-        # Skip duplicates
-        if opt_lower in seen:
-            continue
+        by_lower = {str(opt).lower(): opt for opt in reversed(options)}
+        answer = by_lower.get(answer.lower(), options[0])
 
-        seen.add(opt_lower)
-        cleaned_options.append(opt_str)
+    # Clean options - drop blank and vague ones, then case-insensitive duplicates (first wins)
+    kept = [opt for opt in (str(o).strip() for o in options) if opt and not VAGUE_OPTION_RE.search(opt)]
+    unique: Dict[str, str] = {}
+    for opt in kept:
+        unique.setdefault(opt.lower(), opt)
 
     # Ensure we have 4 quality options
-    while len(cleaned_options) < 4:
-        filler = generate_meaningful_filler(question, answer, len(cleaned_options))
-        filler_lower = filler.lower()
-        if filler_lower not in seen:
-            seen.add(filler_lower)
-            cleaned_options.append(filler)
+    if len(unique) < 4 and not allow_fillers:
+        return None
+    # Each candidate is tried once: fillers already among the options are skipped
+    for filler in (*_filler_candidates(question), *FILLER_GENERIC):
+        if len(unique) >= 4:
+            break
+        unique.setdefault(filler.lower(), filler)
+    if len(unique) < 4:
+        return None
+    cleaned_options = list(unique.values())
 
     # Ensure answer is in cleaned options
     if answer not in cleaned_options:
@@ -394,35 +713,45 @@ def validate_mcq(mcq: Dict) -> Optional[Dict]:
 
 def generate_meaningful_filler(question: str, answer: str, index: int) -> str:
     """Generate a meaningful filler option."""
+    fillers = _filler_candidates(question)
+    return fillers[index % len(fillers)]
+
+
+def _filler_candidates(question: str) -> Tuple[str, ...]:
+    """Filler options suited to the kind of question asked."""
     question_lower = question.lower()
 
     if question_lower.startswith("who"):
-        people = ["Alan Turing", "Isaac Newton", "Marie Curie", "Charles Darwin"]
-        return people[index % len(people)]
+        return FILLER_PEOPLE
+    if "capital" in question_lower:
+        return FILLER_CAPITALS
+    if DATE_QUESTION_RE.search(question_lower):
+        return FILLER_YEARS
+    return FILLER_GENERIC
 
-    elif "capital" in question_lower:
-        capitals = ["London", "Berlin", "Tokyo", "Beijing"]
-        return capitals[index % len(capitals)]
 
-    elif any(term in question_lower for term in ["year", "when", "date"]):
-        years = ["1945", "1969", "1776", "2001"]
-        return years[index % len(years)]
+def _iter_sentences(text: str, min_length: int = 20, keep_punctuation: bool = False) -> Iterator[str]:
+    """
+    Lazily yield stripped sentences longer than ``min_length`` characters.
 
-    else:
-        generic = [
-            "A related concept from the same field",
-            "An important but different aspect",
-            "A frequently confused alternative",
-            "A similar but distinct element"
-        ]
-        return generic[index % len(generic)]
+    With ``keep_punctuation`` each sentence keeps its closing ``.``, ``!`` or ``?``.
+    """
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        sentence = text[start:match.start()].strip()
+        start = match.end()
+        if len(sentence) > min_length:
+            yield sentence + match.group() if keep_punctuation else sentence
+    sentence = text[start:].strip()
+    if len(sentence) > min_length:
+        yield sentence
 
 
 def generate_fallback_mcqs(text: str, max_questions: int) -> List[Dict]:
     """Generate simple fallback MCQs."""
-    print("⚠️ Using fallback MCQ generation")
+    mcq_logger.warning("⚠️ Using fallback MCQ generation")
 
-    sentences = [s.strip() for s in re.split(r'[.!?]', text) if len(s.strip()) > 20]
+    sentences = list(islice(_iter_sentences(text), max_questions))
 
     mcqs = []
     for i in range(min(max_questions, len(sentences))):
@@ -445,23 +774,45 @@ def generate_fallback_mcqs(text: str, max_questions: int) -> List[Dict]:
     return mcqs[:max_questions]
 
 
-def make_flashcards(text: str, lang: str = "English", max_cards: int = 20) -> List[Dict]:
+async def make_flashcards(text: str, lang: str = "English", max_cards: int = 20) -> List[Dict]:
     """Generate flashcards from text."""
-    print(f"📚 Generating flashcards in {lang}...")
+    mcq_logger.debug("📚 Generating flashcards in %s...", lang)
 
     # Generate MCQs (this will handle translation if needed)
-    mcqs = make_mcqs(text, language=lang, max_questions=max_cards)
-
-    # Convert to flashcards
-    flashcards = []
-    for mcq in mcqs:
-        flashcards.append({
-            "question": mcq["question"],
-            "answer": mcq["answer"]
-        })
+    mcqs = await make_mcqs(text, language=lang, max_questions=max_cards)
 
-    print(f"✅ Generated {len(flashcards)} flashcards in {lang}")
-    return flashcards[:max_cards]
+    flashcards = _to_flashcards(mcqs, max_cards)
+    mcq_logger.info("✅ Generated %d flashcards in %s", len(flashcards), lang)
+    return flashcards
+
+
+async def make_flashcards_multilang(text: str, langs: List[str], max_cards: int = 20) -> Dict[str, List[Dict]]:
+    """
+    Generate flashcards for several languages from a single English MCQ set.
+
+    English MCQs are generated once and translated to every other requested
+    language concurrently; returns {language: flashcards}.
+    """
+    langs = list(dict.fromkeys(langs))
+    english_mcqs = await make_mcqs(text, language="English", max_questions=max_cards)
+
+    targets = [lang for lang in langs if lang.lower() != "english"]
+    api_key = gemini_api_key()
+    if english_mcqs and api_key:
+        translations = await asyncio.gather(
+            *(translate_mcqs_to_language(english_mcqs, lang, api_key) for lang in targets)
+        )
+    else:
+        translations = [english_mcqs] * len(targets)
+    by_lang = dict(zip(targets, translations))
+
+    flashcards = {lang: _to_flashcards(by_lang.get(lang, english_mcqs), max_cards) for lang in langs}
+    mcq_logger.info("✅ Generated flashcards in %d languages", len(flashcards))
+    return flashcards
+
+
+def _to_flashcards(mcqs: List[Dict], max_cards: int) -> List[Dict]:
+    return [{"question": mcq["question"], "answer": mcq["answer"]} for mcq in mcqs[:max_cards]]
 
 
 def translate_text(text: str, target_lang: str) -> str:
@@ -469,36 +820,45 @@ def translate_text(text: str, target_lang: str) -> str:
     if target_lang == "English":
         return text
 
-    api_key = GEMINI_API_KEY
-    if not api_key:
+    if not gemini_api_key():
         return text
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
-
-        prompt = f"Translate this to {target_lang}: {text}"
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        return _translate_text_cached(text, target_lang)
     except Exception:
         return text
 
 
-def generate_short_form_script(topic: str) -> str:
-    """Generate a simple, topic-specific Quillium Shorts narration."""
+@lru_cache(maxsize=4096)
+def _translate_text_cached(text: str, target_lang: str) -> str:
+    """Translate one string with Gemini; failures raise, so they are never cached."""
+    model = _gemini_model()
+    prompt = f"Translate this to {target_lang}: {text}"
+    for attempt in Retrying(**GEMINI_RETRY_POLICY):
+        with attempt:
+            response = model.generate_content(prompt)
+    return response.text.strip()
+
+
+async def generate_short_form_script(topic: str) -> Tuple[str, bool]:
+    """
+    Generate a simple, topic-specific Quillium Shorts narration.
+
+    Returns (script, is_fallback); ``is_fallback`` is True when Gemini was
+    not used, so callers know not to cache the script.
+    """
     normalized_topic = topic.strip() if topic else ""
     if not normalized_topic:
-        return "Let's learn something new today. Choose a topic to explore."
+        return "Let's learn something new today. Choose a topic to explore.", True
 
     # If no API key, return a simple script
-    api_key = GEMINI_API_KEY
+    api_key = gemini_api_key()
     if not api_key:
-        print("⚠️ GEMINI_API_KEY missing, returning simple short script")
-        return _build_simple_short_script(normalized_topic)
+        shorts_logger.warning("⚠️ GEMINI_API_KEY missing, returning simple short script")
+        return _build_simple_short_script(normalized_topic), True
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = _gemini_model(api_key)
 
         # SIMPLE, RELAXED PROMPT - No strict sentence counts or word limits
         prompt = f"""Create a short educational explanation about "{normalized_topic}" for a video.
@@ -512,9 +872,10 @@ Write it as plain text that can be read aloud in about 45-60 seconds.
 Use simple, clear language suitable for beginners.
 Focus on factual information, not motivational language."""
 
-        print(f"🤖 Generating short script for: {normalized_topic}")
+        shorts_logger.debug("🤖 Generating short script for: %s", normalized_topic)
 
-        response = model.generate_content(
+        response = await generate_content(
+            model,
             prompt,
             generation_config={
                 "temperature": 0.8,
@@ -528,14 +889,13 @@ Focus on factual information, not motivational language."""
         # Clean up the script
         script = _cleanup_script(script)
 
-        print(f"✅ Generated script: {len(script.split())} words")
-        return script
+        # _cleanup_script leaves exactly one space between words
+        shorts_logger.info("✅ Generated script: %d words", script.count(" ") + 1 if script else 0)
+        return script, False
 
     except Exception as e:
-        print(f"❌ Short script generation failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return _build_simple_short_script(normalized_topic)
+        shorts_logger.exception("❌ Short script generation failed: %s", e)
+        return _build_simple_short_script(normalized_topic), True
 
 
 def _cleanup_script(script: str) -> str:
@@ -544,17 +904,14 @@ def _cleanup_script(script: str) -> str:
         return ""
 
     # Remove markdown code blocks
-    if script.startswith("```"):
-        script = re.sub(r"^```[a-zA-Z]*", "", script).strip()
-        if script.endswith("```"):
-            script = script[:-3].strip()
+    script = CODE_FENCE_RE.sub("", script).strip()
 
     # Remove quotes if present
-    if script.startswith('"') and script.endswith('"') and len(script) > 1:
+    if len(script) > 1 and script[0] == script[-1] == '"':
         script = script[1:-1]
 
     # Normalize whitespace
-    script = re.sub(r"\s+", " ", script)
+    script = WHITESPACE_RE.sub(" ", script)
 
     # Ensure it ends with proper punctuation
     if not script.endswith((".", "!", "?")):
@@ -622,15 +979,10 @@ def _sanitize_plain_text_script(raw_text: Optional[str]) -> str:
     """Remove code fences, quotes, and normalize whitespace for narration text."""
     if not raw_text:
         return ""
-    text = raw_text.strip()
-    if text.startswith("```"):
-        text = re.sub(r"^```[a-zA-Z]*", "", text).strip()
-        if text.endswith("```"):
-            text = text[:-3].strip()
-    if text.startswith('"') and text.endswith('"') and len(text) > 1:
+    text = CODE_FENCE_RE.sub("", raw_text.strip()).strip()
+    if len(text) > 1 and text[0] == text[-1] == '"':
         text = text[1:-1].strip()
-    text = re.sub(r"\s+", " ", text)
-    return text
+    return WHITESPACE_RE.sub(" ", text)
 
 
 def _build_fallback_short_script(topic: str) -> str:
@@ -642,7 +994,7 @@ def _build_fallback_short_script(topic: str) -> str:
     )
 
 
-if __name__ == "__main__":
+async def _demo():
     # Test with sample text
     sample_text = """
     Artificial Intelligence (AI) was coined by John McCarthy in 1956.
@@ -657,7 +1009,7 @@ if __name__ == "__main__":
     test_topics = ["Binary Search", "OS Scheduling", "Machine Learning"]
     for topic in test_topics:
         print(f"\nTopic: {topic}")
-        script = generate_short_form_script(topic)
+        script, _ = await generate_short_form_script(topic)
         print(f"Script ({len(script.split())} words):")
         print(f"  {script[:150]}...")
 
@@ -670,7 +1022,7 @@ if __name__ == "__main__":
     if "GEMINI_API_KEY" in os.environ:
         del os.environ["GEMINI_API_KEY"]
 
-    fallback_script = generate_short_form_script("Test Topic")
+    fallback_script, _ = await generate_short_form_script("Test Topic")
     print(f"\nFallback script:")
     print(f"  {fallback_script[:200]}...")
 
@@ -685,7 +1037,7 @@ if __name__ == "__main__":
     # Set a dummy API key for testing MCQ generation
     os.environ["GEMINI_API_KEY"] = "test-key-123"
 
-    english_mcqs = make_mcqs(sample_text, language="English", max_questions=2)
+    english_mcqs = await make_mcqs(sample_text, language="English", max_questions=2)
     if english_mcqs:
         for i, mcq in enumerate(english_mcqs):
             print(f"\n{i+1}. {mcq['question']}")
@@ -694,3 +1046,8 @@ if __name__ == "__main__":
             print(f"   Difficulty: {mcq['difficulty']}")
     else:
         print("No MCQs generated - API key issue or text too short")
+
+
+if __name__ == "__main__":
+    # One event loop for the whole demo; the genai async client is bound to it
+    asyncio.run(_demo())
@@ -22,7 +22,8 @@ class ProcessRequest(BaseModel):
     question_count: int = 20
 
 class ProcessResponse(BaseModel):
-    text: str
+    preview: str
+    text_length: int
     page_count: int
     mcqs: List[MCQ]
     flashcards: List[Flashcard]
@@ -45,6 +46,17 @@ class AskQuillRequest(BaseModel):
 class AskQuillResponse(BaseModel):
     reply: str
 
+class JobStatus(str, Enum):
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    result: Optional[ProcessResponse] = None
+    error: Optional[str] = None
+
 class ProgressData(BaseModel):
     total_questions: int = 0
     correct_answers: int = 0
@@ -1,8 +1,22 @@
+import asyncio
+import logging
+import math
+import anyio
 import fitz  # PyMuPDF
 import re
-from typing import Tuple, Optional
+from concurrent.futures import Executor
+from typing import BinaryIO, Tuple, Optional, Union
 import io
 
+logger = logging.getLogger("quillium.pdf")
+
+# Size-adaptive extraction thresholds (page counts). Small documents are
+# cheapest as a single in-process pass; medium ones are streamed in chunks
+# to bound memory; only very large documents amortize process pool overhead.
+SMALL_PDF_MAX_PAGES = 50
+MEDIUM_PDF_MAX_PAGES = 500
+MEDIUM_PDF_CHUNK_PAGES = 200
+
 def clean_text(text: str) -> str:
     """Clean extracted text."""
     # Remove excessive whitespace
@@ -16,41 +30,144 @@ def clean_text(text: str) -> str:
     text = re.sub(r'[^\w\s.,;:!?()-]', '', text)
     return text.strip()
 
-def extract_text_from_pdf(file_content: bytes) -> Tuple[str, int]:
+PdfSource = Union[bytes, BinaryIO]
+
+def read_pdf_source(source: PdfSource) -> bytes:
+    """Return PDF bytes from raw bytes or a readable file object (read from the start)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+def count_pages(file_content: bytes) -> int:
+    """Return the page count of a PDF without extracting any text."""
+    doc = fitz.open(stream=file_content, filetype="pdf")
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+def extract_page_range(file_content: bytes, start: int, stop: int) -> str:
+    """
+    Extract raw text for pages ``start`` to ``stop`` (exclusive).
+
+    Module-level so it can be pickled and run inside a process pool worker.
     """
-    Extract text from PDF bytes.
+    doc = fitz.open(stream=file_content, filetype="pdf")
+    try:
+        page_texts = []
+        for page_num in range(start, min(stop, doc.page_count)):
+            page_text = doc[page_num].get_text("text").strip()
+            if page_text:
+                page_texts.append(page_text)
+        return " ".join(page_texts)
+    finally:
+        doc.close()
+
+def _finalize_text(full_text: str, page_count: int) -> Tuple[str, int]:
+    # Clean the text
+    full_text = clean_text(full_text)
+    
+    if len(full_text.strip()) < 50:
+        return "This document contains minimal text. Please try a document with more content.", page_count
+    
+    logger.info("✅ Extracted %d characters from %d pages", len(full_text), page_count)
+    return full_text.strip(), page_count
+
+def extract_text_from_pdf(source: PdfSource) -> Tuple[str, int]:
+    """
+    Extract text from a PDF.
     
     Args:
-        file_content: PDF file bytes
+        source: PDF file bytes or a readable file object
         
     Returns:
         Tuple of (extracted_text, page_count)
     """
     try:
-        # Open PDF from bytes
-        doc = fitz.open(stream=file_content, filetype="pdf")
-        page_count = doc.page_count
-        full_text = ""
-        
-        print(f"📄 Processing {page_count} pages...")
-        
-        for page_num in range(page_count):
-            page = doc[page_num]
-            page_text = page.get_text("text").strip()
-            if page_text:
-                full_text += page_text + " "
+        file_content = read_pdf_source(source)
+        page_count = count_pages(file_content)
+        logger.info("📄 Processing %d pages...", page_count)
+        full_text = extract_page_range(file_content, 0, page_count)
+        return _finalize_text(full_text, page_count)
         
+    except Exception as e:
+        logger.error("❌ PDF processing error: %s", e)
+        return f"Error processing PDF: {str(e)}", 0
+
+def plan_extraction(page_count: int, workers: int) -> Tuple[str, int]:
+    """
+    Pick (strategy, pages_per_chunk) for a document of ``page_count`` pages.
+
+    Large documents are split into one chunk per process pool worker.
+    """
+    if page_count <= SMALL_PDF_MAX_PAGES:
+        return "batch", max(page_count, 1)
+    if page_count <= MEDIUM_PDF_MAX_PAGES:
+        return "stream", MEDIUM_PDF_CHUNK_PAGES
+    return "processes", math.ceil(page_count / max(workers, 1))
+
+def extract_pages_in_process(file_content: bytes, chunk_pages: int, release_between_chunks: bool = False) -> str:
+    """
+    Extract all pages in the current process, ``chunk_pages`` at a time.
+    
+    With ``release_between_chunks`` MuPDF's resource store is emptied after
+    each chunk, bounding memory on medium-sized documents.
+    """
+    doc = fitz.open(stream=file_content, filetype="pdf")
+    try:
+        chunks = []
+        for start in range(0, doc.page_count, chunk_pages):
+            page_texts = []
+            for page_num in range(start, min(start + chunk_pages, doc.page_count)):
+                page_text = doc[page_num].get_text("text").strip()
+                if page_text:
+                    page_texts.append(page_text)
+            if page_texts:
+                chunks.append(" ".join(page_texts))
+            if release_between_chunks:
+                fitz.TOOLS.store_shrink(100)
+        return " ".join(chunks)
+    finally:
         doc.close()
+
+async def extract_text_from_pdf_adaptive(source: PdfSource, executor: Executor, workers: int) -> Tuple[str, int]:
+    """
+    Extract text from a PDF, choosing the strategy by page count.
+    
+    Small documents are extracted in one pass on a worker thread, medium ones
+    are streamed in chunks, and only very large ones pay the cost of fanning
+    page chunks out to ``executor``. Thread work goes through anyio's default
+    limiter, so it shares the server's threadpool size.
+    
+    Args:
+        source: PDF file bytes or a readable file object
+        executor: Process pool used for very large documents
+        workers: Number of workers in ``executor``
         
-        # Clean the text
-        full_text = clean_text(full_text)
-        
-        if len(full_text.strip()) < 50:
-            return "This document contains minimal text. Please try a document with more content.", page_count
-        
-        print(f"✅ Extracted {len(full_text)} characters from {page_count} pages")
-        return full_text.strip(), page_count
+    Returns:
+        Tuple of (extracted_text, page_count)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        # PyMuPDF needs one contiguous buffer, so the source is read exactly once
+        file_content = await anyio.to_thread.run_sync(read_pdf_source, source)
+        page_count = await anyio.to_thread.run_sync(count_pages, file_content)
+        strategy, chunk_pages = plan_extraction(page_count, workers)
+        logger.info("📄 Processing %d pages (%s, %d pages per chunk)...", page_count, strategy, chunk_pages)
+
+        if strategy == "processes":
+            chunks = await asyncio.gather(*[
+                loop.run_in_executor(executor, extract_page_range, file_content, start, start + chunk_pages)
+                for start in range(0, page_count, chunk_pages)
+            ])
+            full_text = " ".join(chunk for chunk in chunks if chunk)
+        else:
+            full_text = await anyio.to_thread.run_sync(
+                extract_pages_in_process, file_content, chunk_pages, strategy == "stream"
+            )
+        return await anyio.to_thread.run_sync(_finalize_text, full_text, page_count)
         
     except Exception as e:
-        print(f"❌ PDF processing error: {e}")
-        return f"Error processing PDF: {str(e)}", 0
\ No newline at end of file
+        logger.error("❌ PDF processing error: %s", e)
+        return f"Error processing PDF: {str(e)}", 0
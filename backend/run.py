@@ -1,4 +1,5 @@
 import os
+import sys
 import uvicorn
 from dotenv import load_dotenv
 
@@ -9,4 +10,12 @@ if __name__ == "__main__":
     host = os.getenv("BACKEND_HOST", "0.0.0.0")
     
     print(f"🚀 Starting Quillium backend on {host}:{port}")
-    uvicorn.run("app.main:app", host=host, port=port, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        reload=True,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        log_config=None,
+    )
\ No newline at end of file
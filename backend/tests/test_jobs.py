@@ -0,0 +1,67 @@
+from app.jobs import JobStore
+
+
+def _store_pair(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    return JobStore(path), JobStore(path)
+
+
+def test_claim_is_shared_between_connections(tmp_path):
+    first, second = _store_pair(tmp_path)
+    assert first.claim("key", "job-1", "pending-1") == ("job-1", "pending-1")
+    # A second worker sees the job that already owns the key
+    assert second.claim("key", "job-2", "pending-2") == ("job-1", "pending-1")
+    assert second.get("job-1") == "pending-1"
+    assert second.get("job-2") is None
+
+
+def test_finish_updates_payload_and_keeps_key(tmp_path):
+    first, second = _store_pair(tmp_path)
+    first.claim("key", "job-1", "pending")
+    first.finish("job-1", "done")
+    assert second.get("job-1") == "done"
+    assert second.claim("key", "job-2", "pending") == ("job-1", "done")
+
+
+def test_failed_job_releases_key(tmp_path):
+    first, second = _store_pair(tmp_path)
+    first.claim("key", "job-1", "pending")
+    first.finish("job-1", "failed", release_key=True)
+    assert second.claim("key", "job-2", "pending") == ("job-2", "pending")
+    assert second.get("job-1") == "failed"
+
+
+def test_prune_keeps_newest_finished_and_all_pending(tmp_path):
+    store, _ = _store_pair(tmp_path)
+    store.claim("running", "running", "pending")
+    for i in range(5):
+        store.claim(f"key-{i}", f"job-{i}", "pending")
+        store.finish(f"job-{i}", "done")
+    store.prune(2)
+    assert store.get("running") == "pending"
+    assert [store.get(f"job-{i}") for i in range(5)] == [None, None, None, "done", "done"]
+
+
+def _stale_store(tmp_path, stale_after):
+    return JobStore(
+        str(tmp_path / "jobs.sqlite3"),
+        stale_after=stale_after,
+        stale_payload=lambda job_id: f"stale-{job_id}",
+    )
+
+
+def test_stale_job_is_failed_and_releases_key(tmp_path):
+    crashed = _stale_store(tmp_path, stale_after=0)
+    crashed.claim("key", "job-1", "pending")
+    crashed.close()
+    # A restarted worker neither reuses the dead job nor reports it as pending
+    restarted = _stale_store(tmp_path, stale_after=0)
+    assert restarted.claim("key", "job-2", "pending") == ("job-2", "pending")
+    assert restarted.get("job-1") == "stale-job-1"
+
+
+def test_recent_pending_job_is_not_stale(tmp_path):
+    store = _stale_store(tmp_path, stale_after=3600)
+    store.claim("key", "job-1", "pending")
+    assert store.claim("key", "job-2", "pending") == ("job-1", "pending")
+    assert store.get("job-1") == "pending"
@@ -0,0 +1,45 @@
+import orjson
+import pytest
+
+from app.json_stream import JsonObjectStream
+
+MCQS = [
+    {"question": "What does {x} mean in \"f-strings\"?", "answer": "A placeholder", "options": ["}", "{", "\\", "A placeholder"]},
+    {"question": "Who wrote it?", "answer": "Ada", "options": ["Ada", "Alan", "Grace", "Edsger"]},
+]
+ARRAY = orjson.dumps(MCQS, option=orjson.OPT_INDENT_2).decode()
+
+
+def _feed_all(pieces):
+    parser = JsonObjectStream()
+    objects = []
+    for piece in pieces:
+        objects.extend(parser.feed(piece))
+    return objects
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    assert _feed_all([ARRAY]) == MCQS
+
+
+@pytest.mark.parametrize("offset", range(len(ARRAY) + 1))
+def test_object_split_at_every_offset(offset):
+    assert _feed_all([ARRAY[:offset], ARRAY[offset:]]) == MCQS
+
+
+def test_one_character_at_a_time():
+    assert _feed_all(list(ARRAY)) == MCQS
+
+
+def test_prose_and_code_fences_around_array():
+    reply = f"Here are your questions:\n```json\n{ARRAY}\n```\nLet me know if you need more {{ or }} help!"
+    assert _feed_all([reply]) == MCQS
+
+
+def test_stray_brace_before_array_is_ignored():
+    reply = f"Sure {{ here is the JSON you asked for [as requested]:\n{ARRAY}"
+    assert _feed_all([reply]) == MCQS
+
+
+def test_invalid_object_is_skipped():
+    assert _feed_all(['[{"a": 1,}, {"b": 2}]']) == [{"b": 2}]
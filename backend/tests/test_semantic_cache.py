@@ -0,0 +1,65 @@
+import types
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import SemanticCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = SemanticCache()
+    cache.add("What is  Photosynthesis?", None, "reply")
+    assert cache.get_exact("  what is photosynthesis?\n") == "reply"
+    assert cache.get_exact("what is respiration?") is None
+
+
+def test_similar_hit_above_threshold_and_miss_below():
+    cache = SemanticCache(threshold=0.92)
+    cache.add("prompt", [1.0, 0.0], "reply")
+    # Cosine similarities just above and just under the threshold; length doesn't matter
+    assert cache.get_similar([0.93 * 3, (1 - 0.93 ** 2) ** 0.5 * 3]) == "reply"
+    assert cache.get_similar([0.91, (1 - 0.91 ** 2) ** 0.5]) is None
+
+
+def test_expiry_drops_exact_entry_and_matrix_row(clock):
+    cache = SemanticCache(ttl_seconds=10)
+    cache.add("old", [1.0, 0.0], "old reply")
+    clock[0] += 5
+    cache.add("new", [0.0, 1.0], "new reply")
+    clock[0] += 6
+    assert cache.get_exact("old") is None
+    assert cache.get_similar([1.0, 0.0]) is None
+    assert cache.get_exact("new") == "new reply"
+    assert cache.get_similar([0.0, 1.0]) == "new reply"
+    assert cache._matrix.shape == (1, 2)
+    assert cache._replies == ["new reply"]
+
+
+def test_max_entries_drops_oldest():
+    cache = SemanticCache(max_entries=2)
+    cache.add("a", [1.0, 0.0, 0.0], "reply a")
+    cache.add("b", [0.0, 1.0, 0.0], "reply b")
+    cache.add("c", [0.0, 0.0, 1.0], "reply c")
+    assert cache.get_exact("a") is None
+    assert cache.get_similar([1.0, 0.0, 0.0]) is None
+    assert [cache.get_exact(p) for p in ("b", "c")] == ["reply b", "reply c"]
+    assert cache._matrix.shape == (2, 3)
+    assert cache._replies == ["reply b", "reply c"]
+
+
+def test_embedding_dimension_change_resets_matrix():
+    cache = SemanticCache()
+    cache.add("a", [1.0, 0.0], "reply a")
+    cache.add("b", [0.0, 0.0, 1.0], "reply b")
+    assert cache._matrix.shape == (1, 3)
+    assert cache.get_similar([1.0, 0.0]) is None
+    assert cache.get_similar([0.0, 0.0, 1.0]) == "reply b"
+    # Exact matches survive the reset
+    assert cache.get_exact("a") == "reply a"
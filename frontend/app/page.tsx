@@ -102,7 +102,7 @@ export default function Home() {
       })
       
       const formattedData = {
-        text: apiData.text || "Text extracted from PDF",
+        text: apiData.preview || "Text extracted from PDF",
         mcqs: apiData.mcqs || [],
         flashcards: apiData.flashcards || [],
         pageCount: apiData.page_count || 1,